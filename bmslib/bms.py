@@ -1,14 +1,34 @@
 import math
 import time
-from copy import copy
 from typing import List, Dict, Optional
 from dataclasses import dataclass
 from bmslib.protection import Protection
 
 MIN_VALUE_EXPIRY = 20
 
+# JK alarm word bit -> Protection attribute (see BmsSample.to_protection_bits)
+_PROTECTION_BITS: tuple[tuple[str, int], ...] = (
+    ("low_soc", 0x00001000),  # low capacity alarm
+    ("high_internal_temperature", 0x00000002),  # MOSFET temperature alarm
+    ("high_voltage", 0x00000020),  # charge over voltage alarm
+    ("low_voltage", 0x00000800),  # discharge under voltage alarm
+    ("high_charge_current", 0x00000040),  # charge overcurrent alarm
+    ("high_discharge_current", 0x00002000),  # discharge over current alarm
+    ("high_cell_voltage", 0x00000010),  # cell overvoltage alarm
+    ("low_cell_voltage", 0x00001000),  # cell undervoltage alarm (same bit as low_soc)
+    ("high_charge_temperature", 0x00000100),  # charge over temperature
+    ("low_charge_temperature", 0x00000200),  # charge under temperature
+    ("high_temperature", 0x00008000),  # discharge over temperature
+)
+
+
+def _validate_switches(switches: Dict[str, bool]):
+    assert all(type(v) is bool for v in switches.values()), "non-bool switches values %s" % switches
+
 
 class DeviceInfo:
+    __slots__ = ('mnf', 'model', 'hw_version', 'sw_version', 'name', 'sn', 'psk', '_float_charger', 'address', '_str')
+
     def __init__(self, mnf: str, model: str, hw_version: Optional[str], sw_version: Optional[str], name: Optional[str],
                  sn: Optional[str] = None, psk: Optional[str] = None, address: Optional[int] = None):
         self.mnf = mnf
@@ -18,10 +38,26 @@ class DeviceInfo:
         self.name = name
         self.sn = sn
         self.psk = psk
-        self.float_charger = False
+        self._float_charger = False
         self.address = address
+        self._str: Optional[str] = None
+
+    @property
+    def float_charger(self) -> bool:
+        return self._float_charger
+
+    @float_charger.setter
+    def float_charger(self, value: bool):
+        self._float_charger = value
+        self._str = None
 
     def __str__(self):
+        # fields do not change after decoding (except float_charger, whose setter drops the cache)
+        if self._str is None:
+            self._str = self._format()
+        return self._str
+
+    def _format(self) -> str:
         s = f'DeviceInfo({self.model},hw-{self.hw_version},sw-{self.sw_version}'
         if self.name:
             s += ',' + self.name
@@ -129,6 +165,7 @@ class SettingsData:
     :type start_bal_vol: float
     """
 
+    # s_decode_O1 passes these positionally: add new parameters at the end
     def __init__(self, address: int, vol_smart_sleep: float, vol_cell_uv: float, vol_cell_uvpr: float,
                  vol_cell_ov: float, vol_cell_ovpr: float, vol_balan_trig: float, vol_soc_full: float,
                  vol_soc_empty: float, vol_rcv: float, vol_rfv: float, vol_sys_pwr_off: float,
@@ -184,14 +221,11 @@ class SettingsData:
         self.switches = switches
         self.status_282 = status_282
 
-        if switches:
-            assert all(map(lambda x: isinstance(x, bool), switches.values())), "non-bool switches values %s" % switches
-
+        if __debug__ and switches:
+            _validate_switches(switches)
 
     def __str__(self):
-        s = 'SettingsData('
-        attrs = [f"{attr}={getattr(self, attr)}" for attr in dir(self) if not attr.startswith('_')]
-        return s + ','.join(attrs) + ')'
+        return 'SettingsData(' + ','.join(f"{attr}={getattr(self, attr)}" for attr in self._FIELDS) + ')'
 
     address: int
     vol_smart_sleep: float
@@ -230,10 +264,25 @@ class SettingsData:
     scp_delay: int
     start_bal_vol: float
     tim_prodischarge: float
+    status_282: int
     switches: Dict[str, bool]
 
+    _FIELDS = tuple(__annotations__)
+    __slots__ = _FIELDS
+
 
 class BmsSample:
+    __slots__ = ('address', 'voltage', 'current', '_power', 'balance_current', 'charge', 'capacity', 'soc',
+                 'cycle_capacity', 'num_cycles', 'temperatures', 'mos_temperature', 'switches', 'uptime',
+                 'timestamp', 'voltages', 'resistances', 'temp_status_flag', 'minimum_voltage_cell_index',
+                 'maximum_voltage_cell_index', 'maximum_voltage_difference', 'cell_average_voltage',
+                 'battery_status', 'num_samples', 'alarm', 'balance_line_resistance_status', 'balance_state',
+                 'trame_str', 'temp_moyenne', 'temp_max', 'temp_min', 'setting', 'protection', 'charge_status',
+                 'discharge_status', 'heating_current', 'bat_voltage', 'bat_voltage_correct',
+                 'vol_discharge_current', 'vol_charge_current', 'bat_discharge_current_correct',
+                 'emergency_switch_time')
+
+    # s_decode_sample passes these positionally: add new parameters at the end
     def __init__(self, voltage, current, power=math.nan,
                  charge=math.nan, capacity=math.nan, cycle_capacity=math.nan,
                  num_cycles=math.nan, soc=math.nan,
@@ -280,7 +329,8 @@ class BmsSample:
         :param temperatures:
         :param mos_temperature:
         :param uptime: BMS uptime in seconds
-        :param timestamp: seconds since epoch (unix timestamp from time.time())
+        :param timestamp: seconds since epoch (unix timestamp from time.time()) the data was read at. Decoders pass
+            the receive time of the frame; only samples built without one fall back to the current time.
         """
         self.address = ad
         self.voltage: float = voltage
@@ -289,9 +339,10 @@ class BmsSample:
         self.balance_current = balance_current
 
         # infer soc from capacity if soc is nan or type(soc)==int (for higher precision)
-        if capacity > 0 and (math.isnan(soc) or (isinstance(soc, int) and charge > 0)):
+        # (x != x is the NaN test, without the math.isnan call)
+        if capacity > 0 and (soc != soc or (charge > 0 and type(soc) is int)):
             soc = round(charge / capacity * 100, 2)
-        elif math.isnan(capacity) and soc > .2:
+        elif capacity != capacity and soc > .2:
             capacity = round(charge / soc * 100)
 
         # assert math.isfinite(soc)
@@ -305,7 +356,7 @@ class BmsSample:
         self.mos_temperature = mos_temperature
         self.switches = switches
         self.uptime = uptime
-        self.timestamp = timestamp or time.time()
+        self.timestamp = time.time() if timestamp is None else timestamp
         self.voltages = voltages
         self.resistances = resistances
         self.temp_status_flag = temp_status_flag
@@ -323,6 +374,7 @@ class BmsSample:
         self.temp_max = temp_max
         self.temp_min = temp_min
         self.setting : Optional[SettingsData]= None
+        self.protection: Optional[Protection] = None
         if alarm is not None:
             self.protection = Protection()
             self.to_protection_bits(alarm)
@@ -336,8 +388,8 @@ class BmsSample:
         self.bat_discharge_current_correct = bat_discharge_current_correct
         self.emergency_switch_time = emergency_switch_time
 
-        if switches:
-            assert all(map(lambda x: isinstance(x, bool), switches.values())), "non-bool switches values %s" % switches
+        if __debug__ and switches:
+            _validate_switches(switches)
 
     @property
     def power(self):
@@ -354,7 +406,7 @@ class BmsSample:
         return self.voltage * self.current
 
     def values(self):
-        return {**self.__dict__, "power": self.power}
+        return {**{k: getattr(self, k) for k in self.__slots__}, "power": self.power}
 
     def __str__(self):
         # noinspection PyStringFormat
@@ -362,12 +414,12 @@ class BmsSample:
         s += 'ad=%s, ' % self.address
         if not math.isnan(self.soc):
             s += '%.1f%%,' % self.soc
-        vals = self.values()
-        s += ', U=%(voltage).1fV,I=%(current).2fA,P=%(power).0fW,' % vals
+        s += ', U=%.1fV,I=%.2fA,P=%.0fW,' % (self.voltage, self.current, self.power)
         if not math.isnan(self.charge):
-            s += 'Q=%(charge).0f/' % vals
-        s += 'capacity=%(capacity).0fAh,mos=%(mos_temperature).0f°C' % vals
-        s += 'maximum_voltage_difference= %(maximum_voltage_difference).0fV,cell_average_voltage=%(cell_average_voltage).0fV' % vals
+            s += 'Q=%.0f/' % self.charge
+        s += 'capacity=%.0fAh,mos=%.0f°C' % (self.capacity, self.mos_temperature)
+        s += 'maximum_voltage_difference= %.0fV,cell_average_voltage=%.0fV' % (self.maximum_voltage_difference,
+                                                                                self.cell_average_voltage)
         if self.temperatures:
             s += ',temp=[%s]' % ','.join(map(str, self.temperatures))
         if self.voltages:
@@ -377,8 +429,17 @@ class BmsSample:
     def invert_current(self):
         return self.multiply_current(-1)
 
+    def _clone(self):
+        """
+        Shallow copy by slot iteration, without the generic copy/reduce protocol.
+        """
+        res = object.__new__(type(self))
+        for k in self.__slots__:
+            setattr(res, k, getattr(self, k))
+        return res
+
     def multiply_current(self, x):
-        res = copy(self)
+        res = self._clone()
         if res.current != 0:  # prevent -0 values
             res.current *= x
         if not math.isnan(res._power) and res._power != 0:
@@ -415,30 +476,17 @@ class BmsSample:
         Bit 0x00200000: Battery over Temp: 1 alarm, 0 nomal
         """
 
-        # low capacity alarm
-        self.protection.low_soc = (byte_data & 0x00001000) * 2
-        # MOSFET temperature alarm
-        self.protection.high_internal_temperature = (byte_data & 0x00000002) * 2
-        # charge over voltage alarm
-        self.protection.high_voltage = (byte_data & 0x00000020) * 2
-        # discharge under voltage alarm
-        self.protection.low_voltage = (byte_data & 0x00000800) * 2
-        # charge overcurrent alarm
-        self.protection.high_charge_current = (byte_data & 0x00000040) * 2
-        # discharge over current alarm
-        self.protection.high_discharge_current = (byte_data & 0x00002000) * 2
+        p = self.protection
+        if not byte_data:
+            for name, _ in _PROTECTION_BITS:
+                setattr(p, name, Protection.OK)
+        else:
+            for name, mask in _PROTECTION_BITS:
+                setattr(p, name, Protection.ALARM if byte_data & mask else Protection.OK)
         # core differential pressure alarm OR unit overvoltage alarm
-        self.protection.cell_imbalance = 0
-        # cell overvoltage alarm
-        self.protection.high_cell_voltage = (byte_data & 0x00000010) * 2
-        # cell undervoltage alarm
-        self.protection.low_cell_voltage = (byte_data & 0x00001000) * 2
-        # battery overtemperature alarm OR overtemperature alarm in the battery box
-        self.protection.high_charge_temperature = (byte_data & 0x00000100) * 2
-        self.protection.low_charge_temperature = (byte_data & 0x00000200) * 2
-        # check if low/high temp alarm arise during discharging
-        self.protection.high_temperature = (byte_data & 0x00008000) * 2
-        self.protection.low_temperature = 0
+        p.cell_imbalance = Protection.OK
+        p.low_temperature = Protection.OK
+
 
 class BmsSetSwitch:
     def get_name(self):
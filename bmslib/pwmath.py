@@ -1,5 +1,7 @@
 import math
 
+import numpy as np
+
 
 class EWMA:
     # Implement Exponential Weighted Moving Average
@@ -49,6 +51,43 @@ class LHQ:
         return self.last
 
 
+class LHQVec:
+    """
+    LHQ over a vector of channels (e.g. temperature probes). Same algorithm as LHQ, but the EWMA and hysteresis
+    state of all channels is held in two numpy arrays and updated with one vectorized expression per step.
+    Channels are added as longer inputs come in.
+    """
+
+    def __init__(self, span=20, inp_q=0.1):
+        self.alpha = 2 / (span + 1)
+        self.inp_q = inp_q
+        self.y = np.empty(0)
+        self.last = np.empty(0)
+
+    def add(self, x) -> np.ndarray:
+        x = np.asarray(x, dtype=np.float64)
+        n = len(x)
+        if n > len(self.y):
+            pad = np.full(n - len(self.y), math.nan)
+            self.y = np.concatenate((self.y, pad))
+            self.last = np.concatenate((self.last, pad))
+        y, last = self.y[:n], self.last[:n]  # views, updated in place
+
+        # EWMA.add
+        fin = np.isfinite(x)
+        first = fin & ~np.isfinite(y)
+        y[first] = x[first]
+        y[fin] = (1 - self.alpha) * y[fin] + self.alpha * x[fin]
+
+        # quantize(mean((last,x,x))
+        m = (last + 2 * y) / 3
+        no_m = np.isnan(m)
+        init = no_m & np.isnan(last)
+        last[init] = x[init]
+        last[~no_m] = np.round(m[~no_m] * 2 / self.inp_q) * .5 * self.inp_q
+        return np.where(no_m, math.nan, last)
+
+
 class EWM:
     # Implement EWMA statistics mean and stddev
     def __init__(self, span: int, std_regularisation: float):
@@ -80,14 +119,16 @@ class EWM:
 class Integrator:
     """
     Implement a trapezoidal integration, discarding samples with dx > dx_max.
+    `scale` is applied to the integral (e.g. 1e-3 to integrate W into kWh).
     """
 
-    def __init__(self, name, dx_max, value=0.):
+    def __init__(self, name, dx_max, value=0., scale=1.):
         self.name = name
         self._last_x = math.nan
         self._last_y = math.nan
         self._integrator = value
         self.dx_max = dx_max
+        self._half_scale = scale / 2  # folded into the trapezoid mean, costs nothing per sample
 
     def __iadd__(self, other):
         """
@@ -109,7 +150,7 @@ class Integrator:
             if dx < 0:
                 raise ValueError("x must be monotonic increasing (given %s, last %s)" % (x, self._last_x))
             if dx <= self.dx_max:
-                y_hat = (self._last_y + y) / 2
+                y_hat = (self._last_y + y) * self._half_scale
                 self._integrator += dx * y_hat
 
         self._last_x = x
@@ -168,6 +209,11 @@ def test_integrator():
     i += (5, 3)  # skip (>dt_max)
     assert i.get() == (3 + 2.5)
 
+    i = Integrator("test", dx_max=1, scale=1e-3)
+    i += (0, 1000)
+    i += (1, 3000)
+    assert i.get() == 2
+
 
 def test_diff_abs_sum():
     i = DiffAbsSum("test", dx_max=1, dy_max=0.1)
@@ -194,7 +240,15 @@ def test_lhq():
     assert l.add(0.1) == 0.1
 
 
+def test_lhq_vec():
+    lv = LHQVec(span=2, inp_q=.1)
+    ls = [LHQ(span=2, inp_q=.1) for _ in range(3)]
+    for x in ([0, 20.0], [0.1, math.nan, 5], [0.1, 20.2, 5.3], [math.nan, 20.4, 5.1]):
+        assert np.array_equal(lv.add(x), [l.add(v) for l, v in zip(ls, x)], equal_nan=True)
+
+
 if __name__ == "__main__":
     test_integrator()
     test_diff_abs_sum()
     test_lhq()
+    test_lhq_vec()
@@ -1,18 +1,17 @@
 import asyncio
+import functools
 import math
-import queue
 import re
 import time
 import traceback
-from collections import defaultdict
-from copy import copy
 from typing import Optional
 
 import paho.mqtt.client
 
 from bmslib.algorithm import create_algorithm, BatterySwitches
 from bmslib.bms import DeviceInfo, BmsSample, MIN_VALUE_EXPIRY, BmsSetSwitch
-from bmslib.pwmath import Integrator, DiffAbsSum, LHQ
+from bmslib.pwmath import Integrator, DiffAbsSum, LHQ, LHQVec
+from bmslib.store import store_algorithm_state
 from bmslib.util import get_logger_err, get_logger_child
 from mqtt_util import publish_sample, publish_cell_voltages, publish_temperatures, publish_hass_discovery, \
     subscribe_switches, mqtt_single_out
@@ -20,6 +19,9 @@ from mqtt_util import publish_sample, publish_cell_voltages, publish_temperature
 logger = get_logger_child("sampling")
 logger_err = get_logger_err()
 
+# characters not allowed in the MQTT topic prefix; `-` is replaced as before, keeping existing topics and entity ids
+_TOPIC_SANITIZE = re.compile(r'[^\w./]')
+
 class SampleExpiredError(Exception):
     pass
 
@@ -39,9 +41,14 @@ class PeriodicBoolSignal:
     :ivar counter: Number of complete periods elapsed since the signal started.
     :type counter: int
     """
+    __slots__ = ('period', '_period_ns', '_last_t_ns', 'state', 'counter')
+
     def __init__(self, period):
         self.period = period
-        self._last_t = int(time.time())
+        # integer nanoseconds: exact period arithmetic, and the overdue count is a floor division
+        self._period_ns = int(period * 1e9)
+        # monotonic: wall clock steps (NTP) must not shift the period
+        self._last_t_ns = time.monotonic_ns() // 1_000_000_000 * 1_000_000_000
         self.state = True
         self.counter = 0
 
@@ -72,23 +79,22 @@ class PeriodicBoolSignal:
         class's `period` attribute. If the interval has already passed, it adjusts the internal 
         state without incurring a sleep delay.
 
-        :param self: Instance of the class. Requires attributes `period`, `counter`, `_last_t`. 
+        :param self: Instance of the class. Requires attributes `_period_ns`, `counter`, `_last_t_ns`.
         :return: None
         """
-        diff = (time.time() - self._last_t)
-        t = self.period - diff
-        
-        if t <= 0:
+        t_ns = self._period_ns - (time.monotonic_ns() - self._last_t_ns)
+
+        if t_ns <= 0:
             # diff > period
-            nb = int(t/self.period) + 1
-            self.counter+=nb
-            self._last_t += nb * self.period
+            nb = (-t_ns) // self._period_ns + 1
+            self.counter += nb
+            self._last_t_ns += nb * self._period_ns
             return
-        await asyncio.sleep(t)
-        self.counter+=1
-        self._last_t += self.period
+        await asyncio.sleep(t_ns * 1e-9)
+        self.counter += 1
+        self._last_t_ns += self._period_ns
 
-    def set_time(self):
+    def set_time(self, t_now_ns: Optional[int] = None):
         """
         Calculates the time until the next period and updates the internal state and counter if necessary.
 
@@ -97,21 +103,22 @@ class PeriodicBoolSignal:
         next period. If the time has already elapsed, it updates the internal state and resets the time 
         to align with the timing period.
 
+        :param t_now_ns: current time (time.monotonic_ns()), read from the clock if not given. Lets a caller
+            updating several signals at once read the clock once.
         :return: Time in seconds until the next period. Returns 0 if the time period has elapsed.
         :rtype: float
         """
-        diff = (time.time() - self._last_t)
-        t = self.period - diff
-        logger.debug("%s set_time: %s", str(self.period), str(t))
-        if t <= 0:
-            nb = int(t/self.period) + 1
-            self.counter+=nb
-            self._last_t += nb * self.period
+        t_ns = self._period_ns - ((time.monotonic_ns() if t_now_ns is None else t_now_ns) - self._last_t_ns)
+        logger.debug("%s set_time: %s", self.period, t_ns)
+        if t_ns <= 0:
+            nb = (-t_ns) // self._period_ns + 1
+            self.counter += nb
+            self._last_t_ns += nb * self._period_ns
             self.state = True
             return 0
         if self.state:
             self.state = False
-        return t
+        return t_ns * 1e-9
 
 class BmsSampler(BmsSetSwitch):
     """
@@ -136,7 +143,7 @@ class BmsSampler(BmsSetSwitch):
                  bms_set_switch_delegate=Optional[BmsSetSwitch],
                  ):
 
-        self.mqtt_topic_prefix = re.sub(r'[^\w_.-/]', '_', name)
+        self.mqtt_topic_prefix = _TOPIC_SANITIZE.sub('_', name)
         self.mqtt_client = mqtt_client
         self.invert_current = invert_current
         self.expire_after_seconds = expire_after_seconds
@@ -153,8 +160,10 @@ class BmsSampler(BmsSetSwitch):
         self.period_30s = PeriodicBoolSignal(period=30)
 
         self._last_time_log = 0
+        self._log_interval = 60  # seconds, 300 once past the first 1000 samples
 
         self._last_power = 0
+        self._last_power_abs = 0
         self._t_last_power_jump = 0
 
         self._num_errors = 0
@@ -172,9 +181,9 @@ class BmsSampler(BmsSetSwitch):
 
         dx_max = dt_max_seconds / 3600
         self.current_integrator = Integrator(name="total_charge", dx_max=dx_max)
-        self.power_integrator = Integrator(name="total_energy", dx_max=dx_max)
-        self.power_integrator_discharge = Integrator(name="total_energy_discharge", dx_max=dx_max)
-        self.power_integrator_charge = Integrator(name="total_energy_charge", dx_max=dx_max)
+        self.power_integrator = Integrator(name="total_energy", dx_max=dx_max, scale=1e-3)
+        self.power_integrator_discharge = Integrator(name="total_energy_discharge", dx_max=dx_max, scale=1e-3)
+        self.power_integrator_charge = Integrator(name="total_energy_charge", dx_max=dx_max, scale=1e-3)
 
         dx_max_diff = 3600 / 3600  # allow larger gabs for already integrated value
         self.cycle_integrator = DiffAbsSum(name="total_cycles", dx_max=dx_max_diff, dy_max=0.1)
@@ -187,38 +196,58 @@ class BmsSampler(BmsSetSwitch):
         for meter in self.meters:
             if meter_state and meter.name in meter_state:
                 meter.restore(meter_state[meter.name]['reading'])
+        self._meter_topics = tuple(f"{self.mqtt_topic_prefix}/meter/{m.name}" for m in self.meters)
+        self._meter_state_view = {m.name: dict(reading=0.) for m in self.meters}
 
-        self.queue = queue.Queue()
+        # filled by put() from the serial callback, drained by publish_loop() on the same event loop.
+        # Bounded: if publishing stalls, newer samples are dropped instead of piling up
+        self.queue: asyncio.Queue[BmsSample] = asyncio.Queue(maxsize=64)
         # self.power_stats = EWM(span=120, std_regularisation=0.1)
 
         temp_step = 0
         temp_smooth = 10
-        self._lhq_temp = defaultdict(lambda: LHQ(span=temp_smooth, inp_q=temp_step)) if temp_step else None
+        self._lhq_temp = LHQVec(span=temp_smooth, inp_q=temp_step) if temp_step else None
+        self._lhq_mos = LHQ(span=temp_smooth, inp_q=temp_step) if temp_step else None
         self.setting = None
         self.bms_set_switch_delegate = bms_set_switch_delegate
 
     def get_meter_state(self):
-        return {meter.name: dict(reading=meter.get()) for meter in self.meters}
+        """
+        :return: {meter name: {'reading': value}}. The same dict is updated in place and returned on every call,
+            callers must not keep or modify it.
+        """
+        view = self._meter_state_view
+        for meter in self.meters:
+            view[meter.name]['reading'] = meter.get()
+        return view
 
     def _filter_temperatures(self, temperatures):
         if not temperatures or self._lhq_temp is None:
             return temperatures
-        return [round(self._lhq_temp[i].add(temperatures[i]), 2) for i in range(len(temperatures))]
+        return [round(t, 2) for t in self._lhq_temp.add(temperatures).tolist()]
 
     def put(self, sample: BmsSample):
         if self.setting:
             sample.set_setting(self.setting)
-        self.queue.put(sample)
+        try:
+            self.queue.put_nowait(sample)
+        except asyncio.QueueFull:
+            logger_err.error('%s sample queue full, dropping sample %s', self.name, sample.timestamp)
 
-    async def action_queue(self):
-        while not self.queue.empty():
-            sample = self.queue.get(block=False)
+    async def publish_loop(self):
+        """
+        Publish samples as put() queues them. Runs until cancelled, start it once as a task.
+        """
+        while True:
+            sample = await self.queue.get()
             try:
-                logger.debug('action_queue: %s', sample)
+                logger.debug('publish_loop: %s', sample)
                 await self.publish_sample(sample)
             except Exception as e:
                 logger_err.error('exception in action callback: %s', e)
-                logger_err.error("Stack: %s", traceback.format_exc())   
+                logger_err.error("Stack: %s", traceback.format_exc())
+            finally:
+                self.queue.task_done()
 
     async def set_switch(self, switch: str, state: bool):
         """
@@ -236,35 +265,44 @@ class BmsSampler(BmsSetSwitch):
     async def publish_sample(self, sample: BmsSample):
         
         mqtt_client = self.mqtt_client
-        t_now = time.time()
-        t_hour = t_now * (1 / 3600)
+        device_topic = self.mqtt_topic_prefix
+        t_now = time.time()  # wall clock, only to compare with the sample timestamp
+        t_mono_ns = time.monotonic_ns()  # meters, periods and log/jump timers: a wall clock step back would break dx >= 0
+        t_mono = t_mono_ns * 1e-9
+        t_hour = t_mono * (1 / 3600)
 
         if sample.timestamp < t_now - max(self.expire_after_seconds, MIN_VALUE_EXPIRY):
             raise SampleExpiredError("sample %s expired" % sample.timestamp)
 
         sample.num_samples = self.num_samples
+        if self.num_samples == 1000:
+            self._log_interval = 300
 
         if self.current_calibration_factor and self.current_calibration_factor != 1:
             sample = sample.multiply_current(self.current_calibration_factor)
 
         # discharging P>0
-        self.power_integrator_charge += (t_hour, abs(min(0, sample.power_ui)) * 1e-3)  # kWh
-        self.power_integrator_discharge += (t_hour, abs(max(0, sample.power_ui)) * 1e-3)  # kWh
+        # (meters are fed through add_linear/add_diff directly, `meter += (x, y)` costs a tuple per call)
+        p_ui = sample.power_ui
+        self.power_integrator_charge.add_linear(t_hour, -p_ui if p_ui < 0 else 0)  # W -> kWh
+        self.power_integrator_discharge.add_linear(t_hour, p_ui if p_ui > 0 else 0)  # W -> kWh
 
         # self.power_stats.add(sample.power)
         sample.temperatures = self._filter_temperatures(sample.temperatures)
 
-        if not math.isnan(sample.mos_temperature) and self._lhq_temp is not None:
-            sample.mos_temperature = self._lhq_temp['mos'].add(sample.mos_temperature)
+        # filter is usually off: test it first, then NaN (x == x is False only for NaN)
+        if self._lhq_mos is not None and sample.mos_temperature == sample.mos_temperature:
+            sample.mos_temperature = self._lhq_mos.add(sample.mos_temperature)
 
         if self.invert_current:
             sample = sample.invert_current()
+            p_ui = sample.power_ui
 
-        self.current_integrator += (t_hour, sample.current)  # Ah
-        self.power_integrator += (t_hour, sample.power_ui * 1e-3)  # kWh
+        self.current_integrator.add_linear(t_hour, sample.current)  # Ah
+        self.power_integrator.add_linear(t_hour, p_ui)  # W -> kWh
 
-        self.cycle_integrator += (t_hour, sample.soc * (0.01 / 2))  # SoC 100->0 is a half cycle
-        self.charge_integrator += (t_hour, sample.charge)  # Ah
+        self.cycle_integrator.add_diff(t_hour, sample.soc * (0.01 / 2))  # SoC 100->0 is a half cycle
+        self.charge_integrator.add_diff(t_hour, sample.charge)  # Ah
 
         if self.algorithm:
             res = self.algorithm.update(sample)
@@ -273,10 +311,13 @@ class BmsSampler(BmsSetSwitch):
                             BatterySwitches(**sample.switches), res)
 
             if res:
-                from bmslib.store import store_algorithm_state
                 state = self.algorithm.state
                 if state:
-                    store_algorithm_state(self.name, algorithm_name=self.algorithm.name, state=state.__dict__)
+                    # file write off the event loop (serial reads keep going). awaited, not a fire-and-forget task:
+                    # keeps writes in order and the algorithm does not touch the state dict while it is dumped
+                    await asyncio.get_running_loop().run_in_executor(
+                        None, functools.partial(store_algorithm_state, self.name, algorithm_name=self.algorithm.name,
+                                                state=state.__dict__))
 
             if res and res.switches:
                 for swk in sample.switches.keys():
@@ -286,34 +327,46 @@ class BmsSampler(BmsSetSwitch):
 
         if self.subscribe_switches == False and sample.switches and mqtt_client:
             logger.info("%s subscribing for %s switch change", self.name, sample.switches)
-            subscribe_switches(mqtt_client, device_topic=self.mqtt_topic_prefix, bms=self,
+            subscribe_switches(mqtt_client, device_topic=device_topic, bms=self,
                                switches=sample.switches.keys())
             self.subscribe_switches = True
 
-        ## self.downsampler += sample
-
-        log_data = (t_now - self._last_time_log) >= (60 if self.num_samples < 1000 else 300) or self.verbose_log
-        if log_data:
-            self._last_time_log = t_now
-
-        voltages = sample.voltages
-
         PWR_CHG_REG = 120  # regularisation to suppress changes when power is low
         PWR_CHG_HOLD = 4
-        power_chg = (sample.power_ui - self._last_power) / (abs(self._last_power) + PWR_CHG_REG)
-        if abs(power_chg) > 0.15 and abs(sample.power_ui) > abs(self._last_power):
+        PWR_CHG_THRESH_SQ = 0.15 ** 2  # |power_chg| > 0.15, folded at compile time
+        last_power = self._last_power
+        last_power_abs = self._last_power_abs
+        p_abs = abs(p_ui)
+        power_chg = (p_ui - last_power) / (last_power_abs + PWR_CHG_REG)
+        if power_chg * power_chg > PWR_CHG_THRESH_SQ and p_abs > last_power_abs:
             if self.verbose_log or (
-                    not self.period_pub and (t_now - self._t_last_power_jump) > PWR_CHG_HOLD):
+                    not self.period_pub and (t_mono - self._t_last_power_jump) > PWR_CHG_HOLD):
                 logger.info('%s Power jump %.0f %% (prev=%.0f last=%.0f, REG=%.0f)', self.name, power_chg * 100,
-                            self._last_power, sample.power_ui, PWR_CHG_REG)
-            self._t_last_power_jump = t_now
-        self._last_power = sample.power_ui
-        
+                            last_power, p_ui, PWR_CHG_REG)
+            self._t_last_power_jump = t_mono
+        self._last_power = p_ui
+        self._last_power_abs = p_abs
+
+        # meters and algorithm above see every sample, MQTT only gets the average over the publish period.
+        # period_discov/period_30s are only re-armed when publishing, so they stay pending until then.
+        self.downsampler += sample
+        self.period_pub.set_time(t_mono_ns)
+        if not self.period_pub:
+            self.num_samples += 1
+            return sample
+
+        sample = self.downsampler.pop()
+        voltages = sample.voltages
+
+        log_data = self.verbose_log or (t_mono - self._last_time_log) >= self._log_interval
+        if log_data:
+            self._last_time_log = t_mono
+
         # publish home assistant discovery every 120 samples or 10 minutes
         if self.period_discov:
             logger.info("Sending HA discovery for %s (num_samples=%d)", self.name, self.num_samples)
             publish_hass_discovery(
-                mqtt_client, device_topic=self.mqtt_topic_prefix,
+                mqtt_client, device_topic=device_topic,
                 expire_after_seconds=1200,
                 sample=sample,
                 num_cells=len(voltages) if voltages else 0,
@@ -321,35 +374,31 @@ class BmsSampler(BmsSetSwitch):
                 device_info=self.device_info,
             )
 
-        publish_sample(mqtt_client, device_topic=self.mqtt_topic_prefix, sample=sample)
+        publish_sample(mqtt_client, device_topic=device_topic, sample=sample)
         log_data and logger.info('%s: (num_samples=%d) %s', self.name, self.num_samples, sample)
 
-        publish_cell_voltages(mqtt_client, device_topic=self.mqtt_topic_prefix, voltages=voltages, publish_index=self.publish_index, bms_name=self.name)
-        publish_temperatures(mqtt_client, device_topic=self.mqtt_topic_prefix, temperatures=sample.temperatures)
+        publish_cell_voltages(mqtt_client, device_topic=device_topic, voltages=voltages, publish_index=self.publish_index, bms_name=self.name)
+        publish_temperatures(mqtt_client, device_topic=device_topic, temperatures=sample.temperatures)
 
         if log_data and (voltages or sample.temperatures):
-            logger.info('%s volt=[%s] temp=%s', self.name,
-                        ','.join(map(str, voltages)) if voltages else voltages,
-                        sample.temperatures)
+            logger.info('%s volt=%s temp=%s', self.name, voltages, sample.temperatures)
 
         if self.period_discov or self.period_30s:
             self.publish_meters()
 
         self.num_samples += 1
 
-        self.period_pub.set_time()
-        self.period_30s.set_time()
-        self.period_discov.set_time()
+        t_end = time.monotonic_ns()
+        self.period_pub.set_time(t_end)
+        self.period_30s.set_time(t_end)
+        self.period_discov.set_time(t_end)
 
         # pass "light" errors to the caller to trigger a re-connect after too many
         return sample
 
     def publish_meters(self):
-        device_topic = self.mqtt_topic_prefix
-        for meter in self.meters:
-            topic = f"{device_topic}/meter/{meter.name}"
-            s = round(meter.get(), 3)
-            mqtt_single_out(self.mqtt_client, topic, s)
+        for topic, meter in zip(self._meter_topics, self.meters):
+            mqtt_single_out(self.mqtt_client, topic, round(meter.get(), 3))
 
     def set_setting(self, setting):
         self.setting = setting
@@ -361,6 +410,7 @@ class BmsSampler(BmsSetSwitch):
 
 class Downsampler:
     """ Averages multiple BmsSamples """
+    __slots__ = ('_power', '_current', '_voltage', '_num', '_last')
 
     def __init__(self):
         self._power = 0
@@ -381,16 +431,8 @@ class Downsampler:
         if self._num == 0:
             return None
 
-        if self._num == 1:
-            return self._last
-
-        n = 1 / self._num
-        s = copy(self._last)
-
-        if not math.isnan(s._power):
-            s._power = self._power * n
-        s.current = self._current * n
-        s.voltage = self._voltage * n
+        last, num = self._last, self._num
+        power, current, voltage = self._power, self._current, self._voltage
 
         self._power = 0
         self._current = 0
@@ -398,4 +440,15 @@ class Downsampler:
         self._num = 0
         self._last = None
 
+        if num == 1:
+            return last
+
+        n = 1 / num
+        s = last._clone()  # slot-wise copy, same as BmsSample.multiply_current
+
+        if s._power == s._power:  # not NaN
+            s._power = power * n
+        s.current = current * n
+        s.voltage = voltage * n
+
         return s
@@ -1,31 +1,133 @@
 import asyncio
+import functools
+import logging
 import queue
 import struct
-import sys
 import time
 from typing import Union, Optional
 
+import numpy as np
 import serial
 from crcmod import crcmod
+from crcmod.crcmod import _usingExtension as _crcmod_c_ext
 
-from mqtt_util import is_none_or_nan
 from ..bms import BmsSample, SettingsData, DeviceInfo, BmsSetSwitch
 from ..sampling import PeriodicBoolSignal, BmsSampler
 from ..util import to_hex_str, read_str, get_logger_err, get_logger_child
 
-def crc16_modbus2(data: bytes) -> bytearray:
-    i = crc16_modbus(data)
-    return bytearray([i & 0xff, (i >> 8) & 0xff])
+def crc16_modbus2(data: bytes) -> bytes:
+    """
+    CRC16 Modbus of `data`, low byte first as it goes on the wire.
+    crcmod's C extension is already table driven (a pure Python table loop is ~10x slower on 300 byte frames),
+    only the byte packing is done here.
+    """
+    return crc16_modbus(data).to_bytes(2, 'little')
 
 crc16_modbus = crcmod.mkCrcFun(0x18005, rev=True, initCrc=0xFFFF, xorOut=0x0000)
 
+def jk_sum_crc(frame: bytes, n: int) -> int:
+    """
+    JK frame checksum: sum of the first `n` bytes of `frame`, modulo 256.
+    Reduces over a uint8 view of the frame (no slice copy). A SWAR variant over '<u8' words needs byte-lane
+    masking to be correct (the low byte of the plain word sum only counts every 8th byte) and its extra ufunc
+    calls make it slower than this single reduction on 300 byte frames.
+    """
+    return int(np.frombuffer(frame, dtype=np.uint8, count=n).sum()) & 0xFF
+
+@functools.lru_cache(maxsize=64)
+def _modbus_frame(address: int, command: bytes) -> bytes:
+    modbus_msg = bytearray([address])
+    modbus_msg += command
+    modbus_msg += crc16_modbus2(modbus_msg)
+    return bytes(modbus_msg)
+
+# little-endian field readers, compiled once: unpack_from reads in place, no slice per field
+_unpack_i8 = struct.Struct('<b').unpack_from
+_unpack_i16 = struct.Struct('<h').unpack_from
+_unpack_u16 = struct.Struct('<H').unpack_from
+_unpack_u32 = struct.Struct('<I').unpack_from
+# settings frame: 34 consecutive 32-bit fields, TMPBatCOT (20th) read unsigned
+_unpack_settings = struct.Struct('<19iI14i').unpack_from
+# sample frame: one unpack per run of adjacent fields
+#   70: CellSta, CellVolAve, CellVdifMax, MaxVolCellNbr, MinVolCellNbr
+_unpack_cell_stats = struct.Struct('<IHHBB').unpack_from
+#   118 + offset: BatVol, BatWatt, BatCurrent, TempBat1, TempBat2, MOS temperature (before 11.x),
+#   BalanCurrent, SOCStateOfcharge, SOCCapRemain, SOCFullChargeCap, SOCCycleCount, SOCCycleCap,
+#   Runtime, Charge, Discharge
+_unpack_battery_block = struct.Struct('<IIihhh2xhxBIIII4xIBB').unpack_from
+#   188 + offset: discharge current correction, charge / discharge current, voltage correction (float),
+#   battery voltage, heating current
+_unpack_correction_block = struct.Struct('<HHHf4xHH').unpack_from
+#   254 (11.x firmware only): TempBat3, TempBat4, TempBat5
+_unpack_temp_bat_3_5 = struct.Struct('<hhh').unpack_from
+
+# device info frame at 6: model, hw version, sw version, name, serial number (NUL padded)
+_unpack_info_strings = struct.Struct('16s8s16s40s11s').unpack_from
+
+# temp_status byte -> [BIT0 .. BIT7] as bools, one row per possible byte value
+_TEMP_STATUS_FLAGS = [[v & (1 << b) != 0 for b in range(8)] for v in range(256)]
+
+# start of a JK 55 AA EB 90 frame
+FRAME_HEADER_1 = b'\x55'
+FRAME_HEADER_2 = b'\xaa'
+FRAME_HEADER = FRAME_HEADER_1 + FRAME_HEADER_2
+
 logger = get_logger_child("JKSerialIO")
 logger_err = get_logger_err()
 
+if not _crcmod_c_ext:
+    # crcmod silently falls back to pure Python when its extension is not built (~10x slower per frame)
+    logger_err.warning("crcmod C extension not available, CRC checks use the pure Python fallback")
+
+
+async def wait_readable(ser: serial.Serial, timeout: float) -> None:
+    """
+    Wait until the serial port has input to read, or `timeout` seconds passed.
+    Woken by the event loop as soon as the port's fd is readable (add_reader). Falls back to a 10 ms sleep where
+    there is no selectable fd (Windows ports, Proactor event loop).
+
+    :param ser: The serial port.
+    :param timeout: Maximum time to wait in seconds.
+    :return: None
+    """
+    loop = asyncio.get_running_loop()
+    try:
+        fd = ser.fileno()
+        readable = loop.create_future()
+        loop.add_reader(fd, lambda: readable.done() or readable.set_result(None))
+    except (AttributeError, OSError, NotImplementedError):
+        await asyncio.sleep(0.01)
+        return
+    try:
+        await asyncio.wait_for(readable, max(timeout, 0))
+    except asyncio.TimeoutError:
+        pass
+    finally:
+        loop.remove_reader(fd)
+
 float_charge_flag = 0x0200
 heating_flag = 0x0001
 display_flag = 0x0010
 
+# "10 10 70 00 02 04 00 00 00 01",
+def _switch_cmd_10(c: int, state: bool, sampler) -> bytearray:
+    return bytearray([0x10, 0x10, c, 0x00, 0x02, 0x04, 0x00, 0x00, 0x00, 0x01 if state else 0x00])
+
+#10 11 14 00 01 02 30 51
+def _switch_cmd_11(f: int, state: bool, sampler) -> bytearray:
+    v = sampler.setting.status_282 | f if state else sampler.setting.status_282 & f
+    return bytearray([0x10, 0x11, 0x14, 0x00, 0x02, 0x02, v>>8 & 0xFF, v & 0xFF])
+
+# switch name -> (command builder, register / status_282 flag), one dict lookup per switch request
+_SWITCH_COMMANDS = {
+    'charge': (_switch_cmd_10, 0x70),
+    'discharge': (_switch_cmd_10, 0x74),
+    'balance': (_switch_cmd_10, 0x78),
+    'float_charge': (_switch_cmd_11, float_charge_flag),
+    'heating': (_switch_cmd_11, heating_flag),
+    'display': (_switch_cmd_11, display_flag),
+}
+
 class JKSerialIO:
     """
     Manages the serial communication for JK BMS (Battery Management System) using user-defined
@@ -148,59 +250,38 @@ loggin
         :param state: 
         :return: 
         """
-        # "10 10 70 00 02 04 00 00 00 01",
-        def cmd_10(c):
-            return bytearray([0x10, 0x10, c, 0x00, 0x02, 0x04, 0x00, 0x00, 0x00, 0x01 if state else 0x00])
+        entry = _SWITCH_COMMANDS.get(switch)
+        if entry is None:
+            return None
+        build, arg = entry
+        return build(arg, state, sampler)
 
-#10 11 14 00 01 02 30 51
-        def cmd_11(f):
-            v = sampler.setting.status_282 | f if state else sampler.setting.status_282 & f
-            return bytearray([0x10, 0x11, 0x14, 0x00, 0x02, 0x02, v>>8 & 0xFF, v & 0xFF])
-        
-        match switch:
-            case 'charge':
-                return cmd_10(0x70)
-
-            case 'discharge':
-                return cmd_10(0x74)
-
-            case 'balance':
-                return cmd_10(0x78)
-            
-            case 'float_charge':
-                return cmd_11(float_charge_flag)
-            case 'heating':
-                return cmd_11(heating_flag)
-            case 'display':
-                return cmd_11(display_flag)
-        return None
-
-    def generate_cmd(self, command:bytes, address:int=1) -> bytearray:
+    def generate_cmd(self, command:bytes, address:int=1) -> bytes:
         """
         Generate a Modbus RTU command with appended CRC checksum.
 
         This method constructs a Modbus RTU message by adding the provided command to
         a bytearray starting with the given address. It then calculates and appends
         the CRC checksum of the resulting message.
+        The polling commands (status, settings, about) are the same for every cycle, so built
+        frames are cached per (address, command).
 
         :param command: The command to be sent in the Modbus RTU protocol.
         :param address: The address of the Modbus slave device. Defaults to 1.
         :type address: int
         :return: A Modbus RTU formatted message including the CRC checksum.
-        :rtype: bytearray
+        :rtype: bytes
         """
-        modbus_msg = bytearray([address])
-        modbus_msg += command
-        modbus_msg += crc16_modbus2(modbus_msg)
-        return modbus_msg
+        return _modbus_frame(address, bytes(command))
 
     def send_bms_command(self, ser, cmd_bytes: bytearray):
         """
         Sends a Battery Management System (BMS) command via a serial interface. 
 
         This function takes a serialized command represented by a sequence of 
-        bytes and transmits it over the given serial communication channel. Each 
-        byte is formatted as a hexadecimal string before being sent.
+        bytes and transmits it over the given serial communication channel in a
+        single write, flushed so a USB adapter does not hold it back until the
+        next transfer.
 
         :param ser: Serial interface object used for communication.
         :type ser: object
@@ -208,10 +289,8 @@ loggin
         :type cmd_bytes: bytearray
         :return: None
         """
-        for cmd_byte in cmd_bytes:
-            hex_byte = ("{0:02x}".format(cmd_byte))
-            ser.write(bytearray.fromhex(hex_byte))
-        return        
+        ser.write(cmd_bytes)
+        ser.flush()
 
     async def read_serial_data(
             self,
@@ -245,14 +324,7 @@ loggin
                 logger_err.error("Serial port could not be opened")
 
         except Exception:
-            (
-                exception_type,
-                exception_object,
-                exception_traceback,
-            ) = sys.exc_info()
-            file = exception_traceback.tb_frame.f_code.co_filename
-            line = exception_traceback.tb_lineno
-            logger_err.error(f"Exception occurred: {repr(exception_object)} of type {exception_type} in {file} line #{line}")
+            logger_err.exception("Serial loop failed")
 
     async def read_trame_55_aa(self, ser: serial.Serial, callback, length_fixed: int = 308, timeout=0.5):
         """
@@ -276,86 +348,78 @@ loggin
         :rtype: bool
         """
         bms = ser
-        t_now = time.time_ns()
-        ns_timeout= timeout*1e9
+        # the debug lines below hex-dump bytes and frames: check the level once per call, format only if enabled
+        log_debug = logger.isEnabledFor(logging.DEBUG)
+        monotime = time.monotonic_ns  # wall clock steps must not cut short or stretch the timeout
+        t_now = monotime()
+        deadline = t_now + int(timeout * 1_000_000_000)
+        buf = b''
         while not self.shutdown:
-            t_current = time.time_ns() - t_now
-            if t_current > ns_timeout:
-                logger_err.error(f"Timeout to read trame {t_current}")
+            if monotime() >= deadline:
+                logger_err.error(f"Timeout to read trame {monotime() - t_now}")
                 return False
-                
-            if ser.in_waiting >= 4 :
-                b = bms.read(1)
-                logger.debug(f"BMS data received {b.hex()}")
-                if b.hex() == '55' : # header byte 1
-                    b = bms.read(1)
-                    logger.debug(f"BMS data received {b.hex()}")
-                    if b.hex() == 'aa' : # header byte 2
-                        if self.cmd_line.__len__()>0:
-                            await self.cmd_line_11(callback)
-                            self.cmd_line = bytearray()
-    
-                        # next two bytes is the length of the data package, including the two length bytes
-                        length = length_fixed - 2
-                        logger.debug(f"BMS data length {length}")
-                        response_line = None
-                        no_data_counter = 0
-                        while no_data_counter < 20:  # Try up to 20 times with no new data before exiting wait 0.2
-                            if bms.in_waiting > 0:
-                                if response_line is None:
-                                    response_line = bytearray()
-                                l = bms.in_waiting
-                                if response_line.__len__()+l > length:
-                                    l = length-response_line.__len__()
-                                response_line.extend(bms.read(l))
-                                if (response_line.__len__()) == length:
-                                    break
-                                else:
-                                    logger.debug(f"BMS data length {response_line.__len__()} < {length}")
-                                no_data_counter = 0  # Reset counter if data was received
-                            else:
-                                no_data_counter += 1
-                                await asyncio.sleep(0.01)
-    
-                        # Reconstruct the header and length field
-                        data = bytearray.fromhex("55aa")
-                        data += response_line
 
-                        if no_data_counter == 20:
-                            logger_err.error(f"Missing received in {t_current}: {len(data)}")
-                            logger_err.error(f"trame {to_hex_str(data)}")
-    
-                        trame1 = data[0:300]
-                        crc = sum(trame1[:-1]) & 0xFF
-                        trame2 = data[300:]
-                        logger.debug(f"trame1 {to_hex_str(data)}")
-
-                        t_current = time.time_ns() - t_now
-                        
-                        if crc != trame1[-1] & 0xFF:
-                            logger_err.error(f"CRC error in trame1 {crc:02X} != {trame1[-1]:02X}")
-                            logger_err.error(f"Read trame in {t_current}")
-                            logger_err.error(f"trame {to_hex_str(data)}")
-                            return False
-    
-                        crc_cmd = crc16_modbus2(trame2[:-2])
-                        if crc_cmd != trame2[-2:]:
-                            logger_err.error(f"CRC error in trame2 {crc_cmd[0]:02X} {crc_cmd[1]:02X} != {trame2[-2]:02X} {trame2[-1]:02X}")
-                            logger_err.error(f"Read trame in {t_current}")
-                            logger_err.error(f"trame {to_hex_str(data)}")
-                            return False
-
-                        logger.debug(f"Read trame in {t_current}")
-                        await callback(data)
-                        return True
-                    else:
-                        await self.cmd_line_11(callback)
-                        self.cmd_line.extend(b)
-                else:
+            n = ser.in_waiting
+            if n > 0:
+                # At most one command line (11 bytes) per read: the header is searched in C and a read never
+                # reaches past the end of the frame body that follows it
+                buf += bms.read(min(n, 11))
+                if log_debug:
+                    logger.debug(f"BMS data received {buf.hex()}")
+                idx = buf.find(FRAME_HEADER)
+                if idx < 0:
+                    # a trailing 0x55 may be the first half of a header split over two reads
+                    keep = len(buf) - 1 if buf[-1:] == FRAME_HEADER_1 else len(buf)
+                    await self.cmd_line_extend(callback, buf[:keep])
+                    buf = buf[keep:]
+                    continue
+
+                await self.cmd_line_extend(callback, buf[:idx])
+                if len(self.cmd_line) > 0:
                     await self.cmd_line_11(callback)
-                    self.cmd_line.extend(b)
+                    self.cmd_line.clear()
+
+                # next two bytes is the length of the data package, including the two length bytes
+                length = length_fixed - 2
+                if log_debug:
+                    logger.debug(f"BMS data length {length}")
+                # The frame is received straight after the header bytes, the buffer is not copied
+                # again afterward: trame1 / trame2 are views and `data` itself goes to the callback
+                data = bytearray(FRAME_HEADER)
+                data += buf[idx + 2:]  # frame bytes already read along with the header
+                # One blocking read for the rest of the frame, off the event loop: pyserial returns
+                # once all bytes arrived or the port timeout (0.2 s) expired, no 10 ms polling
+                data += await asyncio.get_running_loop().run_in_executor(None, bms.read, length + 2 - len(data))
+                t_current = monotime() - t_now
+
+                if len(data) - 2 < length:
+                    logger_err.error(f"Missing received in {t_current}: {len(data)}")
+                    logger_err.error(f"trame {to_hex_str(data)}")
+
+                if log_debug:
+                    logger.debug(f"trame1 {to_hex_str(data)}")
+
+                with memoryview(data) as frame, frame[0:300] as trame1, frame[300:] as trame2:
+                    crc = jk_sum_crc(trame1, len(trame1) - 1)
+                    if crc != trame1[-1] & 0xFF:
+                        logger_err.error(f"CRC error in trame1 {crc:02X} != {trame1[-1]:02X}")
+                        logger_err.error(f"Read trame in {t_current}")
+                        logger_err.error(f"trame {to_hex_str(data)}")
+                        return False
+
+                    crc_cmd = crc16_modbus2(trame2[:-2])
+                    if crc_cmd != trame2[-2:]:
+                        logger_err.error(f"CRC error in trame2 {crc_cmd[0]:02X} {crc_cmd[1]:02X} != {trame2[-2]:02X} {trame2[-1]:02X}")
+                        logger_err.error(f"Read trame in {t_current}")
+                        logger_err.error(f"trame {to_hex_str(data)}")
+                        return False
+
+                if log_debug:
+                    logger.debug(f"Read trame in {t_current}")
+                await callback(data)
+                return True
             else:
-                await asyncio.sleep(0.01)
+                await wait_readable(ser, (deadline - monotime()) * 1e-9)
         return False
 
     async def read_cmd_answer(self, ser: serial.Serial, cmd_answer: bytes, timeout=0.5):
@@ -375,24 +439,27 @@ loggin
         :return: Returns False if the timeout was reached, or the function is interrupted by shutdown
         :rtype: bool
         """
-        t_now = time.time_ns()
-        ns_timeout= timeout*1e9
+        monotime = time.monotonic_ns
+        t_now = monotime()
+        deadline = t_now + int(timeout * 1_000_000_000)
         while not self.shutdown:
-            t_current = time.time_ns() - t_now
-            if t_current > ns_timeout:
-                logger_err.error(f"Timeout to read trame {t_current}")
+            if monotime() >= deadline:
+                logger_err.error(f"Timeout to read trame {monotime() - t_now}")
                 return False
     
-            if ser.in_waiting >= len(cmd_answer) :
+            n = ser.in_waiting
+            if n >= len(cmd_answer) :
                 b = ser.read(len(cmd_answer))
                 resp = b == cmd_answer
                 if not resp:
-                    logger_err.error(f"Missing response in {t_current}: {len(b)} != {len(cmd_answer)}")
+                    logger_err.error(f"Missing response in {monotime() - t_now}: {len(b)} != {len(cmd_answer)}")
                     logger_err.error(f"cmd_answer {to_hex_str(cmd_answer)}")
                     logger_err.error(f"receive answer {to_hex_str(b)}")
                 return resp
+            elif n == 0:
+                await wait_readable(ser, (deadline - monotime()) * 1e-9)
             else:
-                await asyncio.sleep(0.01)
+                await asyncio.sleep(0.01)  # answer partially received, the rest follows within a few ms
         return False
 
     async def read_serialport_data_mode_master_all_slave(
@@ -453,14 +520,7 @@ loggin
             return
 
         except Exception:
-            (
-                exception_type,
-                exception_object,
-                exception_traceback,
-            ) = sys.exc_info()
-            file = exception_traceback.tb_frame.f_code.co_filename
-            line = exception_traceback.tb_lineno
-            logger_err.error(f"Exception occurred: {repr(exception_object)} of type {exception_type} in {file} line #{line}")
+            logger_err.exception("Serial master polling loop failed")
             return
 
     async def send_command_from_queue(self, callback, counter, length_fixed: int, ser):
@@ -539,15 +599,17 @@ loggin
         :return: An integer reflecting the retry counter after command execution.
         """
         cmd = self.generate_cmd(command, address)
-        logger.debug(f"cmd {address}/{to_hex_str(cmd)}")
+        log_debug = logger.isEnabledFor(logging.DEBUG)
+        if log_debug:
+            logger.debug(f"cmd {address}/{to_hex_str(cmd)}")
         self.send_bms_command(ser, cmd)
         if cmd_answer_index is not None:
             await asyncio.sleep(0.1)
-            cmd_answer =  cmd[0:cmd_answer_index]
-            cmd_answer_modbus_msg = bytearray(cmd_answer)
-            cmd_answer_modbus_msg += crc16_modbus2(cmd_answer_modbus_msg)
-            logger.debug(f"Receive cmd_answer {address}/{to_hex_str(cmd_answer_modbus_msg)}")
-            if not await self.read_cmd_answer(ser, bytes(cmd_answer_modbus_msg)):
+            # the BMS echoes the first bytes of the command (address included) followed by their CRC
+            cmd_answer_modbus_msg = _modbus_frame(address, cmd[1:cmd_answer_index])
+            if log_debug:
+                logger.debug(f"Receive cmd_answer {address}/{to_hex_str(cmd_answer_modbus_msg)}")
+            if not await self.read_cmd_answer(ser, cmd_answer_modbus_msg):
                 logger_err.error(f"cmd_answer {address} not received")
                 return counter
         elif await self.read_trame_55_aa(ser, callback, length_fixed, 0.5):
@@ -597,16 +659,24 @@ loggin
             return
     
         except Exception:
-            (
-                exception_type,
-                exception_object,
-                exception_traceback,
-            ) = sys.exc_info()
-            file = exception_traceback.tb_frame.f_code.co_filename
-            line = exception_traceback.tb_lineno
-            logger_err.error(f"Exception occurred: {repr(exception_object)} of type {exception_type} in {file} line #{line}")
+            logger_err.exception("Serial read loop failed")
             return
 
+    async def cmd_line_extend(self, callback, stray: bytes):
+        """
+        Append bytes received outside a 55AA frame to `cmd_line`. Every complete 11 byte command line is handed to
+        `cmd_line_11` on the way, the same grouping as appending the bytes one at a time.
+
+        :param callback: Passed on to `cmd_line_11`.
+        :param stray: Bytes received between frames.
+        :return: None
+        """
+        while stray:
+            await self.cmd_line_11(callback)
+            take = 11 - len(self.cmd_line)
+            self.cmd_line += stray[:take]
+            stray = stray[take:]
+
     async def cmd_line_11(self, callback):
         """
         Executes a command when the `cmd_line` buffer contains exactly 11 bytes. It calculates
@@ -619,13 +689,15 @@ loggin
             It takes two arguments:
             - The command line data (of type bytearray).
             - A boolean flag indicating whether the checksum matches (True) or not (False).
+            The buffer is reused afterward, the callback must not keep a reference to it.
         :return: None
         """
+        # called before every stray byte is appended, so `cmd_line` never grows past 11 bytes
         if len(self.cmd_line) == 11:
             crc = crc16_modbus2(self.cmd_line[:-2])
             crcGood = self.cmd_line[-2] == crc[0] and self.cmd_line[-1] == crc[1]
             await callback(self.cmd_line, crcGood)
-            self.cmd_line = bytearray()
+            self.cmd_line.clear()
     
     def send_cmd_in_queue(self, cmd:bytes, address):
         """
@@ -642,6 +714,42 @@ loggin
         """
         self.cmd.put_nowait((cmd, address))
 
+class _FrameReader:
+    """
+    Little-endian field reads at absolute offsets of one frame, bound once per decode
+    instead of building a closure per field type.
+    """
+    __slots__ = ('buf',)
+
+    def __init__(self, buf):
+        self.buf = buf
+
+    def i16(self, i):
+        return _unpack_i16(self.buf, i)[0]
+
+    def u32(self, i):
+        return _unpack_u32(self.buf, i)[0]
+
+    def u32_1e3(self, i):
+        return _unpack_u32(self.buf, i)[0] * 1e-3
+
+# constant tail of the trame dump: 16 unused cell slots
+_TRAME_MV_PAD = ' ' + '0mV' * 16
+
+class _TrameStr:
+    """
+    Debug dump of a sample frame (header bytes and cell voltages), formatted only when
+    it is converted to a string, e.g. when a debug record is actually emitted.
+    """
+    __slots__ = ('header', 'voltages')
+
+    def __init__(self, header: bytes, voltages: list[int]):
+        self.header = header
+        self.voltages = voltages
+
+    def __str__(self):
+        return self.header.hex(' ') + ' ' + ''.join([f"{x}mV" for x in self.voltages]) + _TRAME_MV_PAD
+
 # 0x1200  0x0000  0   UINT16  2   R   Cell voltage 0                                      CellVol0            mV
 #         0x0002  2   UINT16  2   R   Cell voltage 1                                      CellVol1            mV
 #         0x0004  4   UINT16  2   R   Cell voltage 2                                      CellVol2            mV
@@ -832,21 +940,25 @@ def s_decode_sample(is_new_11fw_32s, logger,
         offset = 32
         logger.debug('New 11.x firmware, offset=%s', offset)
 
-    i16 = lambda i: int.from_bytes(buf[i:(i + 2)], byteorder='little', signed=True)
-    u8 = lambda i: int.from_bytes(buf[i:(i + 1)], byteorder='little', signed=False)
-    u16 = lambda i: int.from_bytes(buf[i:(i + 2)], byteorder='little', signed=False)
-    u32 = lambda i: int.from_bytes(buf[i:(i + 4)], byteorder='little', signed=False)
-    u16_1e3 = lambda i: u16(i) * 1e-3
-    u32_1e3 = lambda i: u32(i) * 1e-3
-    float32 = lambda i: struct.unpack('<f', buf[i:(i + 4)])[0]
-    s32_1e3 = lambda i: int.from_bytes(buf[i:(i + 4)], byteorder='little', signed=True) * 1e-3
+    r = _FrameReader(buf)
+    i16 = r.i16
+    u8 = buf.__getitem__
+    u32 = r.u32
+    u32_1e3 = r.u32_1e3
 
     temp = lambda x: float('nan') if x == -2000 else (x / 10)
 
-    trame_str = ' '.join(format(x, '02x') for x in buf[0:6])
-    voltages = [u16(6 + i * 2) for i in range(num_cells)]
-    trame_str += ' ' + ''.join(f"{x}mV" for x in voltages)
-    trame_str += ' ' + ''.join(f"{x}mV" for x in [0,0,0,0,0,0,0,0,0,0,0,0,0,0,0,0])
+    # cell voltages / resistances are contiguous little-endian u16 arrays, read them in one go
+    voltages = np.frombuffer(buf, dtype='<u2', count=num_cells, offset=6).tolist()
+    trame_str = _TrameStr(bytes(buf[:6]), voltages)
+
+    (battery_status, cell_average_voltage, maximum_voltage_difference,
+     maximum_voltage_cell_index, minimum_voltage_cell_index) = _unpack_cell_stats(buf, 70)
+    (voltage, power, current, temp_1, temp_2, mos_temp_legacy, balance_current, soc,
+     charge, capacity, num_cycles, cycle_capacity, uptime,
+     charge_status, discharge_status) = _unpack_battery_block(buf, 118 + offset)
+    (bat_discharge_current_correct, vol_charge_current, vol_discharge_current,
+     bat_voltage_correct, bat_voltage, heating_current) = _unpack_correction_block(buf, 188 + offset)
 
     #162
     #164
@@ -857,10 +969,13 @@ def s_decode_sample(is_new_11fw_32s, logger,
     #         0x00FA  250+6 INT16   2   R   Battery temperature                                 TempBat4            0.1°C
     #         0x00FC  252+6 INT16   2   R   Battery temperature                                 TempBat5            0.1°C
 
-    temperatures = [temp(i16(130 + offset)), temp(i16(132 + offset))]
+    temperatures = [temp(temp_1), temp(temp_2)]
     if is_new_11fw_32s:
-        temperatures += [temp(i16(222 + offset)), temp(i16(224 + offset)), temp(i16(226 + offset))]
-        #248, 252, 250
+        # offset is 32 here: TempBat3..5 at 254, MOS temperature at 144
+        temperatures += [temp(t) for t in _unpack_temp_bat_3_5(buf, 254)]
+        mos_temperature = i16(144) / 10
+    else:
+        mos_temperature = mos_temp_legacy / 10
     ## 0x00D0  208+6 UINT8   2   R   MOS temperature sensor                              MOSTempSensorAbsent                             BIT0
     # Battery temperature sensor 1                        BATTempSensor1Absent    1: Normal; 0: Missing   BIT1
     # Battery temperature sensor 2                        BATTempSensor2Absent    1: Normal; 0: Missing   BIT2
@@ -868,33 +983,24 @@ def s_decode_sample(is_new_11fw_32s, logger,
     # Battery temperature sensor 4                        BATTempSensor4Absent    1: Normal; 0: Missing   BIT4
     # Battery temperature sensor 5                        BATTempSensor5Absent    1: Normal; 0: Missing   BIT5
     # Heating status                                      Heating                 1: On; 0: Off
-    mos_temperature = i16((112 if is_new_11fw_32s else 134) + offset) / 10
     
     temp_somme = mos_temperature
     temp_count = 1
     temp_min = mos_temperature
     temp_max = mos_temperature
-    for i in range(0, len(temperatures)):
-        if not is_none_or_nan(temperatures[i]):
-            if temperatures[i]<temp_min:
-                temp_min=temperatures[i]
-            if temperatures[i]>temp_max:
-                temp_max=temperatures[i]
-            temp_somme+=temperatures[i]
-            temp_count+=1
+    for t in temperatures:
+        # temp() maps an absent sensor to NaN, the only value not equal to itself
+        if t == t:
+            if t < temp_min:
+                temp_min = t
+            elif t > temp_max:
+                temp_max = t
+            temp_somme += t
+            temp_count += 1
     temp_moyenne = temp_somme/temp_count
     
-    temp_status = u8(208 + 6)
-    temp_status_flag = [
-        temp_status & 0x01 == 0x01 ,
-        temp_status & 0x02 == 0x02 ,
-        temp_status & 0x04 == 0x04 ,
-        temp_status & 0x08 == 0x08 ,
-        temp_status & 0x10 == 0x10,
-        temp_status & 0x20 == 0x20,
-        temp_status & 0x40 == 0x40,
-        temp_status & 0x80 == 0x80
-    ]
+    # copy the table row, each sample owns its list
+    temp_status_flag = _TEMP_STATUS_FLAGS[buf[208 + 6]][:]
     # 70 -> 80
     # 0x0040  64  UINT32  4   R   Battery status                                      CellSta                 BIT[n] is 1, indicating that the battery exists
     # 0x0044  68  UINT16  2   R   Cell average voltage                                CellVolAve          mV
@@ -911,35 +1017,61 @@ def s_decode_sample(is_new_11fw_32s, logger,
     #         0x00BC  188 UINT32  4   R   Run time                                            Runtime             S
     #         0x00C0  192 UINT8   2   R   Charge status                                       Charge                  1: open; 0: close
     #                     UINT8       R   Discharge status                                    Discharge               1: open; 0: close
-    uptime=float(u32(162 + offset)),  # seconds 188
+
+    # switch states from the settings frame
+    if buf_set:
+        switches = {
+            'charge': buf_set[118] != 0,
+            'discharge': buf_set[122] != 0,
+            'balance': buf_set[126] != 0,
+        }
+        if has_float_charger:
+            switches['float_charge'] = buf_set[283] & 2 != 0
+    else:
+        switches = {}
     
     
+    # positional, in BmsSample.__init__ order: binding ~40 keyword arguments by name is a measurable share of the decode
     return BmsSample(
-        trame_str=trame_str,
-        ad=u8(300),
-        # 0x0040  64  UINT32  4   R   Battery status                                      CellSta                 BIT[n] is 1, indicating that the battery exists
-        battery_status=u32(70),
-        # 0x0044  68  UINT16  2   R   Cell average voltage                                CellVolAve          mV
-        cell_average_voltage=u16_1e3(74),
-        # 0x0046  70  UINT16  2   R   Maximum voltage difference                          CellVdifMax         mV
-        maximum_voltage_difference=u16_1e3(76),
-        # 0x0048  72  UINT8   2   R   Maximum voltage cell number                         MaxVolCellNbr
-        maximum_voltage_cell_index=u8(78),
-        #             UINT8       R   Minimum voltage cell number                         MinVolCellNbr
-        minimum_voltage_cell_index=u8(79),
-        voltages = voltages,
-        resistances = [u16(80 + i * 2) for i in range(num_cells)],
-        #144
-        mos_temperature=mos_temperature,
-        temp_status_flag=temp_status_flag,
-        # 0x008C  140 UINT32  4   R   Balance line resistance status                      CellWireResSta          BIT[n] is 1, indicating that the balance line alarm
-        balance_line_resistance_status=u32_1e3(146),
         # 0x0090  144 UINT32  4   R   Total battery voltage                               BatVol              mV
-        voltage=u32_1e3(118 + offset), #150
-        # 0x0094  148 UINT32  4   R   Battery power                                       BatWatt             mW
-        power=u32_1e3(122 + offset), #152
+        voltage * 1e-3,  # voltage, 150
         # 0x0098  152 INT32   4   R   Battery current                                     BatCurrent          mA
-        current=-s32_1e3(126 + offset), #158
+        -(current * 1e-3),  # current, 158
+        # 0x0094  148 UINT32  4   R   Battery power                                       BatWatt             mW
+        power * 1e-3,  # power, 152
+        # 0x00A8  168 INT32   4   R   Remaining capacity                                  SOCCapRemain        mAH
+        charge * 1e-3,  # charge, "remaining capacity"
+        # 0x00AC  172 UINT32  4   R   Actual battery capacity                             SOCFullChargeCap    mAH
+        capacity * 1e-3,  # capacity, computed capacity (starts at self.capacity, which is user-defined),
+        # 0x00B4  180 UINT32  4   R   Total cycle capacity                                SOCCycleCap         mAH
+        cycle_capacity * 1e-3,  # cycle_capacity, total charge TODO rename cycle charge
+        # 0x00B0  176 UINT32  4   R   Number of cycles                                    SOCCycleCount       times
+        num_cycles,
+        soc,
+        # 0x00A4  164 INT16   2   R   Balancing current                                   BalanCurrent        mA
+        balance_current / 1000,  # balance_current, 170
+        temperatures,
+        voltages,
+        np.frombuffer(buf, dtype='<u2', count=num_cells, offset=80).tolist(),  # resistances
+        #144
+        mos_temperature,
+        temp_status_flag,
+        # 146 charge_full (see above)
+        switches,
+        # 0x00BC  188 UINT32  4   R   Run time                                            Runtime             S
+        float(uptime),  # uptime, seconds
+        t_buf,  # timestamp
+        u8(300),  # ad
+        #             UINT8       R   Minimum voltage cell number                         MinVolCellNbr
+        minimum_voltage_cell_index,
+        # 0x0048  72  UINT8   2   R   Maximum voltage cell number                         MaxVolCellNbr
+        maximum_voltage_cell_index,
+        # 0x0046  70  UINT16  2   R   Maximum voltage difference                          CellVdifMax         mV
+        maximum_voltage_difference * 1e-3,  # maximum_voltage_difference
+        # 0x0044  68  UINT16  2   R   Cell average voltage                                CellVolAve          mV
+        cell_average_voltage * 1e-3,  # cell_average_voltage
+        # 0x0040  64  UINT32  4   R   Battery status                                      CellSta                 BIT[n] is 1, indicating that the battery exists
+        battery_status,
         #162 T1
         #164 T2
         #         0x00A0  160 UINT32  4   R   Balance line resistance is too large                AlarmWireRes            1: Fault; 0: Normal     BIT0
@@ -966,57 +1098,34 @@ def s_decode_sample(is_new_11fw_32s, logger,
         #                                     Battery over-temperature alarm                      Battery Over Temp Alarm 1: Fault; 0: Normal     BIT21
         #                                     Temperature sensor abnormality                      Temperature sensor anomaly
         #                                     Parallel module failure                             PLCModule anomaly
-        alarm=u32(166),
-        # 0x00A4  164 INT16   2   R   Balancing current                                   BalanCurrent        mA
-        balance_current=i16(138 + offset) / 1000, #170
+        u32(166),  # alarm
+        # 0x008C  140 UINT32  4   R   Balance line resistance status                      CellWireResSta          BIT[n] is 1, indicating that the balance line alarm
+        u32_1e3(146),  # balance_line_resistance_status
         #  0x00A6  166 UINT8   2   R   Balancing state                                     BalanSta            %   2: discharge; 1: charge; 0: off
         #              UINT8       R   Remaining power                                     SOCStateOfcharge
-        balance_state=u8(172),
-        soc=buf[141 + offset],
-        # 0x00A8  168 INT32   4   R   Remaining capacity                                  SOCCapRemain        mAH
-        charge=u32_1e3(142 + offset),  # "remaining capacity"
-        # 0x00AC  172 UINT32  4   R   Actual battery capacity                             SOCFullChargeCap    mAH
-        capacity=u32_1e3(146 + offset),  # computed capacity (starts at self.capacity, which is user-defined),
-        # 0x00B0  176 UINT32  4   R   Number of cycles                                    SOCCycleCount       times
-        num_cycles=u32(150 + offset),
-        # 0x00B4  180 UINT32  4   R   Total cycle capacity                                SOCCycleCap         mAH
-        cycle_capacity=u32_1e3(154 + offset),  # total charge TODO rename cycle charge
-        temperatures=temperatures,
-        temp_min=temp_min,
-        temp_max=temp_max,
-        temp_moyenne=temp_moyenne,
-
-
-        # 146 charge_full (see above)
-
-        switches=dict(
-            charge=bool(buf_set[118]),
-            discharge=bool(buf_set[122]),
-            balance=bool(buf_set[126]),
-            **(dict(float_charge=bool(buf_set[283] & 2)) if has_float_charger else {}),
-        ) if buf_set else {},
-        # 0x00BC  188 UINT32  4   R   Run time                                            Runtime             S
-        uptime=float(u32(162 + offset)),  # seconds
+        u8(172),  # balance_state
+        trame_str,
+        temp_moyenne,
+        temp_max,
+        temp_min,
         # 0x00C0  192 UINT8   2   R   Charge status                                       Charge                  1: open; 0: close
-        charge_status=u8(166 + offset),
+        charge_status,
         #             UINT8       R   Discharge status                                    Discharge               1: open; 0: close
-        discharge_status=u8(167 + offset),
-        #         0x00D4  212 UINT16  2   R   Emergency switch time                               TimeEmergency       S
-        emergency_switch_time=u32(212 - 32 + 6 + offset),
-        #         0x00D6  214 UINT16  2   R   Discharge current correction factor                 BatDisCurCorrect
-        bat_discharge_current_correct=u16(214 - 32 + 6 + offset),
-        #         0x00D8  216 UINT16  2   R   Charging current sensor voltage                     VolChargCur         mV
-        vol_charge_current=u16_1e3(216 - 32 + 6 + offset),
-        #         0x00DA  218 UINT16  2   R   Discharge current sensor voltage                    VolDischargCur      mV
-        vol_discharge_current=u16_1e3(218 - 32 + 6 + offset),
-        #         0x00DC  220 FLOAT   4   R   Battery voltage correction factor                   BatVolCorrect
-        bat_voltage_correct=float32(220 - 32 + 6 + offset),
-        #         0x00E4  228 UINT16  2   R   Battery voltage                                     BatVol              0.01V
-        bat_voltage=u16(228 - 32 + 6 + offset)/100,
+        discharge_status,
         #         0x00E6  230 INT16   2   R   Heating current                                     HeatCurrent         mA
-        heating_current=u16_1e3(230 - 32 + 6 + offset),
-        
-        timestamp=t_buf,
+        heating_current * 1e-3,  # heating_current
+        #         0x00E4  228 UINT16  2   R   Battery voltage                                     BatVol              0.01V
+        bat_voltage/100,  # bat_voltage
+        #         0x00DC  220 FLOAT   4   R   Battery voltage correction factor                   BatVolCorrect
+        bat_voltage_correct,
+        #         0x00DA  218 UINT16  2   R   Discharge current sensor voltage                    VolDischargCur      mV
+        vol_discharge_current * 1e-3,  # vol_discharge_current
+        #         0x00D8  216 UINT16  2   R   Charging current sensor voltage                     VolChargCur         mV
+        vol_charge_current * 1e-3,  # vol_charge_current
+        #         0x00D6  214 UINT16  2   R   Discharge current correction factor                 BatDisCurCorrect
+        bat_discharge_current_correct,
+        #         0x00D4  212 UINT16  2   R   Emergency switch time                               TimeEmergency       S
+        u32(212 - 32 + 6 + offset),  # emergency_switch_time
     )
 # Register Map
 # Start address code offset Index Data type Length R/W Data content Content           Unit Note Note
@@ -1115,29 +1224,28 @@ def s_decode_O1(status_data: bytearray) -> SettingsData:
     """
 
 
-    i32 = lambda i: int.from_bytes(status_data[i:(i + 4)], byteorder='little', signed=True)
-    u32 = lambda i: int.from_bytes(status_data[i:(i + 4)], byteorder='little', signed=False)
-    u16 = lambda i: int.from_bytes(status_data[i:(i + 2)], byteorder='little', signed=False)
-
-    vol_smart_sleep = i32(6) / 1000
-    vol_cell_uv = i32(10) / 1000
-    vol_cell_uvpr = i32(14) / 1000
-    vol_cell_ov = i32(18) / 1000
-    vol_cell_ovpr = i32(22) / 1000
-    vol_balan_trig = i32(26) / 1000
-    vol_soc_full = i32(30) / 1000
-    vol_soc_empty = i32(34) / 1000
-    vol_rcv = i32(38) / 1000  # Voltage Cell Request Charge Voltage (RCV)
-    vol_rfv = i32(42) / 1000  # Voltage Cell Request Float Voltage (RFV)
-    vol_sys_pwr_off = i32(46) / 1000
-    max_battery_charge_current = i32(50) / 1000
-    tim_bat_cocp_dly = i32(54)
-    tim_bat_cocpr_dly = i32(58)
-    max_battery_discharge_current = i32(62) / 1000
-    tim_bat_dc_ocp_dly = i32(66)
-    tim_bat_dc_ocpr_dly = i32(70)
-    tim_bat_scpr_dly = i32(74)
-    cur_balan_max = i32(0x48 + 6) / 1000
+    # offsets 6 .. 138: one unpack for the whole run of 32-bit fields
+    f = _unpack_settings(status_data, 6)
+
+    vol_smart_sleep = f[0] / 1000
+    vol_cell_uv = f[1] / 1000
+    vol_cell_uvpr = f[2] / 1000
+    vol_cell_ov = f[3] / 1000
+    vol_cell_ovpr = f[4] / 1000
+    vol_balan_trig = f[5] / 1000
+    vol_soc_full = f[6] / 1000
+    vol_soc_empty = f[7] / 1000
+    vol_rcv = f[8] / 1000  # Voltage Cell Request Charge Voltage (RCV)
+    vol_rfv = f[9] / 1000  # Voltage Cell Request Float Voltage (RFV)
+    vol_sys_pwr_off = f[10] / 1000
+    max_battery_charge_current = f[11] / 1000
+    tim_bat_cocp_dly = f[12]
+    tim_bat_cocpr_dly = f[13]
+    max_battery_discharge_current = f[14] / 1000
+    tim_bat_dc_ocp_dly = f[15]
+    tim_bat_dc_ocpr_dly = f[16]
+    tim_bat_scpr_dly = f[17]
+    cur_balan_max = f[18] / 1000
     #         0x0048  72  UINT32  4   RW  Maximum balancing current                           CurBalanMax         mA
     #         0x004C  76  INT32   4   RW  Charging over-temperature protection                TMPBatCOT           0.1°C
     #         0x0050  80  INT32   4   RW  Charge over temperature recovery                    TMPBatCOTPR         0.1°C
@@ -1148,118 +1256,120 @@ def s_decode_O1(status_data: bytearray) -> SettingsData:
     #         0x0064  100 INT32   4   RW  MOS over temperature protection                     TMPMosOT            0.1°C
     #         0x0068  104 INT32   4   RW  MOS over temperature protection recovery            TMPMosOTPR          0.1°C
     #         0x006C  108 UINT32  4   RW  CellCount                                           CellCount           string
-    tmp_bat_cot = u32(0x4C + 6 ) / 10 # Charging over-temperature protection
-    tmp_bat_cotpr = i32(0x50 + 6) / 10 # Charging over-temperature recovery
-    tmp_bat_dc_ot = i32(0x54 + 6) / 10 # Discharge over temperature protection
-    tmp_bat_dc_otpr = i32(0x58 + 6) / 10 # Discharge over temperature recovery
-    tmp_bat_cut = i32(0x5C + 6) / 10 # Charging low temperature protection
-    tmp_bat_cutpr = i32(0x60 + 6) / 10 # Charging low temperature recovery
-    tmp_mos_ot = i32(0x64 + 6) / 10 # MOS over temperature protection
-    tmp_mos_otpr = i32(0x68 + 6) / 10 # MOS over temperature recovery
-    cell_count = i32(114)
-    bat_charge_en = i32(118)
-    bat_dis_charge_en = i32(122)
-    balan_en = i32(126)
+    tmp_bat_cot = f[19] / 10 # Charging over-temperature protection
+    tmp_bat_cotpr = f[20] / 10 # Charging over-temperature recovery
+    tmp_bat_dc_ot = f[21] / 10 # Discharge over temperature protection
+    tmp_bat_dc_otpr = f[22] / 10 # Discharge over temperature recovery
+    tmp_bat_cut = f[23] / 10 # Charging low temperature protection
+    tmp_bat_cutpr = f[24] / 10 # Charging low temperature recovery
+    tmp_mos_ot = f[25] / 10 # MOS over temperature protection
+    tmp_mos_otpr = f[26] / 10 # MOS over temperature recovery
+    cell_count = f[27]
+    bat_charge_en = f[28]
+    bat_dis_charge_en = f[29]
+    balan_en = f[30]
     
-    capacity = i32(130) / 1000
-    scp_delay = i32(134)
-    start_bal_vol = i32(138) / 1000  # Start Balance Voltage
+    capacity = f[31] / 1000
+    scp_delay = f[32]
+    start_bal_vol = f[33] / 1000  # Start Balance Voltage
 
     charge= bool(bat_charge_en)
     discharge= bool(bat_dis_charge_en)
     balance=bool(balan_en)
     float_charge=bool(status_data[283] & 2)
 
-    tim_prodischarge = u32(274)
+    tim_prodischarge = _unpack_u32(status_data, 274)[0]
     
     # balancer enabled
     address = int(status_data[270])
 
-    logger.debug("vol_smart_sleep: " + str(vol_smart_sleep))
-    logger.debug("vol_cell_uv: " + str(vol_cell_uv))
-    logger.debug("vol_cell_uvpr: " + str(vol_cell_uvpr))
-    logger.debug("vol_cell_ov: " + str(vol_cell_ov))
-    logger.debug("vol_cell_ovpr: " + str(vol_cell_ovpr))
-    logger.debug("vol_balan_trig: " + str(vol_balan_trig))
-    logger.debug("vol_soc_full: " + str(vol_soc_full))
-    logger.debug("vol_soc_empty: " + str(vol_soc_empty))
-    logger.debug("vol_rcv: " + str(vol_rcv))
-    logger.debug("vol_rfv: " + str(vol_rfv))
-    logger.debug("vol_sys_pwr_off: " + str(vol_sys_pwr_off))
-    logger.debug("cur_bat_coc: " + str(max_battery_charge_current))
-    logger.debug("tim_bat_cocp_dly: " + str(tim_bat_cocp_dly))
-    logger.debug("tim_bat_cocpr_dly: " + str(tim_bat_cocpr_dly))
-    logger.debug("cur_bat_dc_oc: " + str(max_battery_discharge_current))
-    logger.debug("tim_bat_dc_ocp_dly: " + str(tim_bat_dc_ocp_dly))
-    logger.debug("tim_bat_dc_ocpr_dly: " + str(tim_bat_dc_ocpr_dly))
-    logger.debug("tim_bat_scpr_dly: " + str(tim_bat_scpr_dly))
-    logger.debug("cur_balan_max: " + str(cur_balan_max))
-    logger.debug("tmp_bat_cot: " + str(tmp_bat_cot))
-    logger.debug("tmp_bat_cotpr: " + str(tmp_bat_cotpr))
-    logger.debug("tmp_bat_dc_ot: " + str(tmp_bat_dc_ot))
-    logger.debug("tmp_bat_dc_otpr: " + str(tmp_bat_dc_otpr))
-    logger.debug("tmp_bat_cut: " + str(tmp_bat_cut))
-    logger.debug("tmp_bat_cutpr: " + str(tmp_bat_cutpr))
-    logger.debug("tmp_mos_ot: " + str(tmp_mos_ot))
-    logger.debug("tmp_mos_otpr: " + str(tmp_mos_otpr))
-    logger.debug("cell_count: " + str(cell_count))
-    logger.debug("charge: " + str(charge))
-    logger.debug("discharge: " + str(discharge))
-    logger.debug("balance: " + str(balance))
-    logger.debug("float_charge: " + str(float_charge))
-    logger.debug("cap_bat_cell: " + str(capacity))
-    logger.debug("scp_delay: " + str(scp_delay))
-    logger.debug("start_bal_vol: " + str(start_bal_vol))
-
-    status_282 = u16(282)
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug("vol_smart_sleep: %s", vol_smart_sleep)
+        logger.debug("vol_cell_uv: %s", vol_cell_uv)
+        logger.debug("vol_cell_uvpr: %s", vol_cell_uvpr)
+        logger.debug("vol_cell_ov: %s", vol_cell_ov)
+        logger.debug("vol_cell_ovpr: %s", vol_cell_ovpr)
+        logger.debug("vol_balan_trig: %s", vol_balan_trig)
+        logger.debug("vol_soc_full: %s", vol_soc_full)
+        logger.debug("vol_soc_empty: %s", vol_soc_empty)
+        logger.debug("vol_rcv: %s", vol_rcv)
+        logger.debug("vol_rfv: %s", vol_rfv)
+        logger.debug("vol_sys_pwr_off: %s", vol_sys_pwr_off)
+        logger.debug("cur_bat_coc: %s", max_battery_charge_current)
+        logger.debug("tim_bat_cocp_dly: %s", tim_bat_cocp_dly)
+        logger.debug("tim_bat_cocpr_dly: %s", tim_bat_cocpr_dly)
+        logger.debug("cur_bat_dc_oc: %s", max_battery_discharge_current)
+        logger.debug("tim_bat_dc_ocp_dly: %s", tim_bat_dc_ocp_dly)
+        logger.debug("tim_bat_dc_ocpr_dly: %s", tim_bat_dc_ocpr_dly)
+        logger.debug("tim_bat_scpr_dly: %s", tim_bat_scpr_dly)
+        logger.debug("cur_balan_max: %s", cur_balan_max)
+        logger.debug("tmp_bat_cot: %s", tmp_bat_cot)
+        logger.debug("tmp_bat_cotpr: %s", tmp_bat_cotpr)
+        logger.debug("tmp_bat_dc_ot: %s", tmp_bat_dc_ot)
+        logger.debug("tmp_bat_dc_otpr: %s", tmp_bat_dc_otpr)
+        logger.debug("tmp_bat_cut: %s", tmp_bat_cut)
+        logger.debug("tmp_bat_cutpr: %s", tmp_bat_cutpr)
+        logger.debug("tmp_mos_ot: %s", tmp_mos_ot)
+        logger.debug("tmp_mos_otpr: %s", tmp_mos_otpr)
+        logger.debug("cell_count: %s", cell_count)
+        logger.debug("charge: %s", charge)
+        logger.debug("discharge: %s", discharge)
+        logger.debug("balance: %s", balance)
+        logger.debug("float_charge: %s", float_charge)
+        logger.debug("cap_bat_cell: %s", capacity)
+        logger.debug("scp_delay: %s", scp_delay)
+        logger.debug("start_bal_vol: %s", start_bal_vol)
+
+    status_282 = _unpack_u16(status_data, 282)[0]
     
     # 55 aa eb 90 01 05 ac 0d 00 00 14 0a 00 00 be 0a 00 00 42 0e 00 00 ac 0d 00 00 05 00 00 00 06 0e 00 00 8c 0a 00 00 10 0e 00 00 ac 0d 00 00 c4 09 00 00 f0 49 02 00 03 00 00 00 3c 00 00 00 f0 49 02 00 2c 01 00 00 3c 00 00 00 05 00 00 00 d0 07 00 00 bc 02 00 00 58 02 00 00 bc 02 00 00 58 02 00 00 38 ff ff ff 9c ff ff ff e8 03 00 00 20 03 00 00 10 00 00 00 01 00 00 00 01 00 00 00 01 00 00 00 68 a7 04 00 dc 05 00 00 7a 0d 00 00 00 00 00 00 00 00 00 00 00 00 00 00 00 00 00 00 00 00 00 00 00 00 00 00 00 00 00 00 00 00 00 00 00 00 00 00 00 00 00 00 00 00 00 00 00 00 00 00 00 00 00 00 00 00 00 00 00 00 00 00 00 00 00 00 00 00 00 00 00 00 00 00 00 00 00 00 00 00 00 00 00 00 00 00 00 00 00 00 00 00 00 00 00 00 00 00 00 00 00 00 00 00 00 00 00 00 00 00 00 00 00 00 00 00 00 00 00 00 00 00 00 00 00 00 00 00 00 00 01 00 00 00 00 00 00 00 60 e3 16 00 11 32 3c 32 18 fe ff ff ff 9f e9 1d 02 00 00 00 00 d4 01 10 16 1e 00 01 65 87
     # 55 aa eb 90 01 05 ac 0d 00 00 14 0a 00 00 be 0a 00 00 42 0e 00 00 ac 0d 00 00 05 00 00 00 06 0e 00 00 8c 0a 00 00 10 0e 00 00 ac 0d 00 00 c4 09 00 00 f0 49 02 00 03 00 00 00 3c 00 00 00 f0 49 02 00 2c 01 00 00 3c 00 00 00 05 00 00 00 d0 07 00 00 bc 02 00 00 58 02 00 00 bc 02 00 00 58 02 00 00 14 00 00 00 46 00 00 00 20 03 00 00 bc 02 00 00 10 00 00 00 01 00 00 00 01 00 00 00 01 00 00 00 68 a7 04 00 dc 05 00 00 e4 0c 00 00 00 00 00 00 00 00 00 00 00 00 00 00 00 00 00 00 00 00 00 00 00 00 00 00 00 00 00 00 00 00 00 00 00 00 00 00 00 00 00 00 00 00 00 00 00 00 00 00 00 00 00 00 00 00 00 00 00 00 00 00 00 00 00 00 00 00 00 00 00 00 00 00 00 00 00 00 00 00 00 00 00 00 00 00 00 00 00 00 00 00 00 00 00 00 00 00 00 00 00 00 00 00 00 00 00 00 00 00 00 00 00 00 00 00 00 00 00 00 00 00 00 00 00 00 00 00 00 00 02 00 00 00 00 00 00 00 60 e3 16 00 10 32 3c 32 18 fe ff ff ff 9f e9 1d 02 00 00 00 00 9c 02 10 16 1e 00 01 65 b4
+    # positional, in SettingsData.__init__ order (see s_decode_sample)
     return SettingsData(
-        address=address,
-        vol_smart_sleep=vol_smart_sleep,
-        vol_cell_uv=vol_cell_uv,
-        vol_cell_uvpr=vol_cell_uvpr,
-        vol_cell_ov=vol_cell_ov,
-        vol_cell_ovpr=vol_cell_ovpr,
-        vol_balan_trig=vol_balan_trig,
-        vol_soc_full=vol_soc_full,
-        vol_soc_empty=vol_soc_empty,
-        vol_rcv=vol_rcv,
-        vol_rfv=vol_rfv,
-        vol_sys_pwr_off=vol_sys_pwr_off,
-        max_battery_charge_current=max_battery_charge_current,
-        tim_bat_cocp_dly=tim_bat_cocp_dly,
-        tim_bat_cocpr_dly=tim_bat_cocpr_dly,
-        max_battery_discharge_current=max_battery_discharge_current,
-        tim_bat_dc_ocp_dly=tim_bat_dc_ocp_dly,
-        tim_bat_dc_ocpr_dly=tim_bat_dc_ocpr_dly,
-        tim_bat_scpr_dly=tim_bat_scpr_dly,
-        tim_prodischarge=tim_prodischarge,
-        cur_balan_max=cur_balan_max,
-        tmp_bat_cot=tmp_bat_cot,
-        tmp_bat_cotpr=tmp_bat_cotpr,
-        tmp_bat_dc_ot=tmp_bat_dc_ot,
-        tmp_bat_dc_otpr=tmp_bat_dc_otpr,
-        tmp_bat_cut=tmp_bat_cut,
-        tmp_bat_cutpr=tmp_bat_cutpr,
-        tmp_mos_ot=tmp_mos_ot,
-        tmp_mos_otpr=tmp_mos_otpr,
-        cell_count=cell_count,
-        charge=charge,
-        discharge=discharge,
-        balance=balance,
-        float_charge=float_charge,
-        capacity=capacity,
-        scp_delay=scp_delay,
-        start_bal_vol=start_bal_vol,
-        status_282 = status_282,
-        switches=dict(
+        address,
+        vol_smart_sleep,
+        vol_cell_uv,
+        vol_cell_uvpr,
+        vol_cell_ov,
+        vol_cell_ovpr,
+        vol_balan_trig,
+        vol_soc_full,
+        vol_soc_empty,
+        vol_rcv,
+        vol_rfv,
+        vol_sys_pwr_off,
+        max_battery_charge_current,
+        tim_bat_cocp_dly,
+        tim_bat_cocpr_dly,
+        max_battery_discharge_current,
+        tim_bat_dc_ocp_dly,
+        tim_bat_dc_ocpr_dly,
+        tim_bat_scpr_dly,
+        cur_balan_max,
+        tmp_bat_cot,
+        tmp_bat_cotpr,
+        tmp_bat_dc_ot,
+        tmp_bat_dc_otpr,
+        tmp_bat_cut,
+        tmp_bat_cutpr,
+        tmp_mos_ot,
+        tmp_mos_otpr,
+        cell_count,
+        charge,
+        discharge,
+        balance,
+        float_charge,
+        capacity,
+        scp_delay,
+        start_bal_vol,
+        status_282,
+        tim_prodischarge,
+        dict(
             charge=bool(status_data[118]),
             discharge=bool(status_data[122]),
             balance=bool(status_data[126]),
             float_charge=bool(status_282 & float_charge_flag)
-        )
+        ),  # switches
     )
 
 
@@ -1284,16 +1394,18 @@ def decode_info(buf, logger):
     psk = read_str(buf, 6 + 16 + 8 + 16 + 40 + 11)
     if psk:
         logger.debug("PSK = '%s' (Note that anyone within BLE range can read this!)", psk)
-    u8 = lambda i: int.from_bytes(buf[i:(i + 1)], byteorder='little', signed=True)
+    # each string ends at its first NUL, at the latest where the next field starts
+    model, hw_version, sw_version, name, sn = [
+        s.split(b'\0', 1)[0].decode() for s in _unpack_info_strings(buf, 6)]
 
     di = DeviceInfo(mnf="JK",
-                    model=read_str(buf, 6),
-                    hw_version=read_str(buf, 6 + 16),
-                    sw_version=read_str(buf, 6 + 16 + 8),
-                    name=read_str(buf, 6 + 16 + 8 + 16),
-                    sn=read_str(buf, 6 + 16 + 8 + 16 + 40),
+                    model=model,
+                    hw_version=hw_version,
+                    sw_version=sw_version,
+                    name=name,
+                    sn=sn,
                     psk=psk,
-                    address=u8(300)
+                    address=_unpack_i8(buf, 300)[0]
                     )
     has_float_charger = ('PB2A16S' in di.model) or ('PB1A16S' in di.model)
     di.float_charger = has_float_charger
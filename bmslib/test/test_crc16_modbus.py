@@ -1,7 +1,7 @@
 import unittest
 
 from crcmod import crcmod
-from bmslib.serialbattery.jkserialio import crc16_modbus2
+from bmslib.serialbattery.jkserialio import crc16_modbus2, jk_sum_crc
 
 # Exemple d'utilisation :
 hex_string = [
@@ -68,4 +68,9 @@ class TestJk02(unittest.TestCase):
             crc_computed = calc_crc16_modbus(frame)
             crc_computed2 = bytes([crc_computed & 0xff, (crc_computed >> 8) & 0xff])
             print(f"CRC = {crc_computed2.hex(' ').upper()}")  # Doit afficher D6 F1
-            assert crc == crc_computed2.hex(' ').upper()        
\ No newline at end of file
+            assert crc == crc_computed2.hex(' ').upper()        
+
+    def test_jk_sum_crc(self):
+        for i in range(0, len(trame_resp), 2):
+            trame1 = bytearray.fromhex(trame_resp[i])[0:300]
+            assert jk_sum_crc(trame1, len(trame1) - 1) == trame1[-1]
@@ -0,0 +1,56 @@
+import asyncio
+import unittest
+from unittest.mock import patch
+
+from bmslib.bms import BmsSample
+from bmslib.sampling import Downsampler, BmsSampler
+
+
+class TestDownsampler(unittest.TestCase):
+    """ unit tests of the sample downsampler """
+
+    def test_single_sample_per_pop(self):
+        d = Downsampler()
+        for v in (10, 20, 30, 40):
+            d += BmsSample(voltage=v, current=v / 10, power=v * v / 10, charge_status=True)
+            s = d.pop()
+            self.assertEqual(s.voltage, v)
+            self.assertEqual(s.current, v / 10)
+            self.assertEqual(s.power, v * v / 10)
+        self.assertIsNone(d.pop())
+
+    def test_average(self):
+        d = Downsampler()
+        d += BmsSample(voltage=10, current=1, power=10, charge_status=True)
+        d += BmsSample(voltage=30, current=3, power=90, charge_status=True)
+        s = d.pop()
+        self.assertEqual(s.voltage, 20)
+        self.assertEqual(s.current, 2)
+        self.assertEqual(s.power, 50)
+        self.assertIsNone(d.pop())
+
+
+class TestPublishPeriod(unittest.TestCase):
+    """ publish_sample() averages the samples of each publish period """
+
+    def test_publish_on_period_boundary(self):
+        clock = [1000 * 10 ** 9]
+        with patch('time.monotonic_ns', lambda: clock[0]), \
+                patch('bmslib.sampling.publish_sample') as pub, \
+                patch('bmslib.sampling.publish_cell_voltages'), \
+                patch('bmslib.sampling.publish_temperatures'), \
+                patch('bmslib.sampling.publish_hass_discovery'), \
+                patch('bmslib.sampling.mqtt_single_out'):
+            sampler = BmsSampler(name='test', address=1, mqtt_client=None, dt_max_seconds=600,
+                                 expire_after_seconds=60, publish_period=5)
+            published = []
+            for i in range(1, 11):
+                clock[0] += 10 ** 9
+                pub.reset_mock()
+                sample = BmsSample(voltage=float(i), current=1., maximum_voltage_difference=0., cell_average_voltage=0.)
+                asyncio.run(sampler.publish_sample(sample))
+                if pub.called:
+                    published.append((i, pub.call_args.kwargs['sample'].voltage))
+
+        # t+5 averages samples 1..5, t+10 averages samples 6..10
+        self.assertEqual(published, [(5, 3.), (10, 8.)])
@@ -25,4 +25,16 @@ class TestPeriod(unittest.TestCase):
                 break
             sleep(5)
             p.set_time()
-            
\ No newline at end of file
+            
+    def test_set_time_overdue(self):
+        p = PeriodicBoolSignal(period=10)
+        t0 = p._last_t_ns
+        s = 1_000_000_000
+        # more than one period late: counts every elapsed period and stays aligned to t0
+        self.assertEqual(p.set_time(t0 + 25 * s), 0)
+        self.assertTrue(p)
+        self.assertEqual(p.counter, 2)
+        self.assertAlmostEqual(p.set_time(t0 + 29 * s), 1.0)
+        self.assertFalse(p)
+        self.assertEqual(p.set_time(t0 + 30 * s), 0)
+        self.assertEqual(p.counter, 3)
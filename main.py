@@ -139,8 +139,6 @@ async def background_loop(timeout: float, sampler_list: List[BmsSampler]):
         logger.info("mqtt watchdog loop started with timeout %.1fs", timeout)
 
     while not shutdown:
-        for bms_s in sampler_list:
-            await bms_s.action_queue()
         await mqtt_process_action_queue()
         if not bg_checks(sampler_list, timeout, t_start):
             break
@@ -150,32 +148,42 @@ async def background_loop(timeout: float, sampler_list: List[BmsSampler]):
 def bytes_to_printable(data: bytes) -> str:
     return ''.join(chr(b) if chr(b).isprintable() else '.' for b in data)
 
+def bytes_to_hex(data: bytes) -> str:
+    return ' '.join(format(x, '02x') for x in data)
+
 async def mon_callback(data, crc=None):
-    be = ' '.join(format(x, '02x') for x in data)
-    if len(data) >= 300 and data[4] == 2:
+    t_recv = time.time()
+    # the hex / printable dumps of the frame are only needed for debug logs (and unknown frames)
+    log_debug = logger_callback.isEnabledFor(logging.DEBUG)
+    be = bytes_to_hex(data) if log_debug else None
+    frame_type = data[4] if len(data) >= 300 else None
+    if frame_type == 2:
         sample = s_decode_sample(is_new_11fw_32s=True,
                                  logger=logger,
                                  num_cells=16,
                                  buf_set=None,
-                                 buf=data, t_buf=time.time(), has_float_charger=True)
+                                 buf=data, t_buf=t_recv, has_float_charger=True)
         logger_callback.info(sample)
-        logger_callback.debug(be)
-        logger_callback.debug(sample.trame_str)
+        if log_debug:
+            logger_callback.debug(be)
+            logger_callback.debug(sample.trame_str)
         bms_sampler = bms_list_by_ad.get(sample.address)
         if bms_sampler:
             bms_sampler.put(sample) 
-    elif len(data) >= 300 and data[4] == 1:
-        logger_callback.debug(be)
-        logger_callback.debug(bytes_to_printable(data))
+    elif frame_type == 1:
+        if log_debug:
+            logger_callback.debug(be)
+            logger_callback.debug(bytes_to_printable(data))
         setting:SettingsData = s_decode_O1(data)
         if setting:
             logger_callback.info(setting)
             bms_sampler = bms_list_by_ad.get(setting.address)
             if bms_sampler:
                 bms_sampler.set_setting(setting)
-    elif len(data) >= 300 and data[4] == 3:
-        logger_callback.debug(be)
-        logger_callback.debug(bytes_to_printable(data))
+    elif frame_type == 3:
+        if log_debug:
+            logger_callback.debug(be)
+            logger_callback.debug(bytes_to_printable(data))
         info = decode_info(data, logger)
         logger_callback.info(info)
         if info:
@@ -184,7 +192,7 @@ async def mon_callback(data, crc=None):
                 bms_sampler.set_info(info)
     else:
         logger_callback.info("trame? ")
-        logger_callback.info(be)
+        logger_callback.info(be or bytes_to_hex(data))
 
 
 if args.port:
@@ -278,6 +286,7 @@ async def main():
     watchdog_en = user_config.get('watchdog', False)
 
     wd_timeout = max(5 * 60., sample_period * 4) if watchdog_en else 0
+    publish_tasks = [asyncio.create_task(bms_s.publish_loop()) for bms_s in serial_sampler_list]
     asyncio.create_task(background_loop(
         timeout=wd_timeout,
         sampler_list=serial_sampler_list
@@ -288,6 +297,8 @@ async def main():
 
     logger.info('All fetch loops ended. shutdown is already %s', shutdown)
     shutdown = True
+    for task in publish_tasks:
+        task.cancel()
 
     store_states(serial_sampler_list)
 
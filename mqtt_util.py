@@ -724,12 +724,14 @@ def publish_cell_voltages(client, device_topic, voltages, publish_index, bms_nam
         mqtt_single_out(client, topic, voltages[i] / 1000)
 
     if len(voltages) > 1:
-        x = range(len(voltages))
-        high_i = max(x, key=lambda i: voltages[i])
-        low_i = min(x, key=lambda i: voltages[i])
-        voltage_min = voltages[low_i] / 1000
-        voltage_max = voltages[high_i] / 1000
-        voltage_delta = (voltages[high_i] - voltages[low_i]) / 1000
+        v_high = max(voltages)
+        v_low = min(voltages)
+        high_i = voltages.index(v_high)  # first cell with the max / min, as max(range, key=) did
+        low_i = voltages.index(v_low)
+        voltage_min = v_low / 1000
+        voltage_max = v_high / 1000
+        voltage_delta = (v_high - v_low) / 1000
+        total = sum(voltages)
         logger.debug("%s publish_cell_voltages (%s, %s, %s)", bms_name, f"{voltage_min}", f"{voltage_max}", f"{voltage_delta}")
 
         if publish_index:
@@ -739,8 +741,8 @@ def publish_cell_voltages(client, device_topic, voltages, publish_index, bms_nam
         mqtt_single_out(client, f"{device_topic}/cell_voltages/min", voltage_min)
         mqtt_single_out(client, f"{device_topic}/cell_voltages/max", voltage_max)
         mqtt_single_out(client, f"{device_topic}/cell_voltages/delta", voltage_delta)
-        mqtt_single_out(client, f"{device_topic}/cell_voltages/average", round(sum(voltages) / len(voltages)) / 1000)
-        mqtt_single_out(client, f"{device_topic}/cell_voltages/total", round(sum(voltages))/1000)
+        mqtt_single_out(client, f"{device_topic}/cell_voltages/average", round(total / len(voltages)) / 1000)
+        mqtt_single_out(client, f"{device_topic}/cell_voltages/total", round(total)/1000)
         mqtt_single_out(client, f"{device_topic}/cell_voltages/median", statistics.median(voltages) / 1000)
 
 
@@ -751,9 +753,52 @@ def publish_temperatures(client, device_topic, temperatures):
             mqtt_single_out(client, topic, round_to_n(temperatures[i], 4))
 
 
+_discovery_cache = {}  # device_topic -> (key, [(topic, json), ...])
+
+
+def _hass_discovery_key(expire_after_seconds, sample: BmsSample, num_cells, temperatures, device_info):
+    """
+    Everything the discovery messages depend on: which fields are set (not None/NaN), cell and temperature count,
+    switch names and device info. Field values themselves are not part of the messages.
+    """
+    setting = sample.setting
+    protection = sample.protection
+    switch_states = sample.switches or (setting and setting.switches)
+    return (
+        expire_after_seconds,
+        num_cells,
+        tuple(is_none_or_nan(getattr(sample, d["field"])) for d in sample_desc.values()),
+        setting and tuple(is_none_or_nan(getattr(setting, d["field"])) for d in sample_setting_desc.values()),
+        protection and tuple(is_none_or_nan(getattr(protection, d["field"])) for d in alarm_desc.values()),
+        tuple(map(is_none_or_nan, temperatures)),
+        tuple(switch_states.keys()) if switch_states else None,
+        device_info and (device_info.sn, device_info.mnf, device_info.name, device_info.model,
+                         device_info.sw_version, device_info.hw_version),
+    )
+
+
 def publish_hass_discovery(client, device_topic, expire_after_seconds: int, sample: BmsSample, num_cells,
                            temperatures,
                            device_info: DeviceInfo = None):
+    """
+    Publish the Home Assistant discovery messages. The JSON payloads are cached per device topic and only rebuilt
+    when _hass_discovery_key() changes (a field appears or disappears, cell count, device info, ...).
+    """
+    key = _hass_discovery_key(expire_after_seconds, sample, num_cells, temperatures, device_info)
+    cached = _discovery_cache.get(device_topic)
+    if cached is None or cached[0] != key:
+        discovery_msg = _hass_discovery_messages(device_topic, expire_after_seconds, sample, num_cells, temperatures,
+                                                 device_info)
+        cached = key, [(topic, json.dumps(data)) for topic, data in discovery_msg.items()]
+        _discovery_cache[device_topic] = cached
+
+    for topic, j in cached[1]:
+        logger.debug('discovery msg %s: %s', topic, j)
+        mqtt_single_out(client, topic, j)
+
+
+def _hass_discovery_messages(device_topic, expire_after_seconds: int, sample: BmsSample, num_cells, temperatures,
+                             device_info: DeviceInfo = None):
     discovery_msg = {}
 
     device_json = {
@@ -867,11 +912,8 @@ def publish_hass_discovery(client, device_topic, expire_after_seconds: int, samp
                 "command_topic": f"homeassistant/switch/{device_topic}/{switch_name}/set",
             }
 
-    for topic, data in discovery_msg.items():
-        j = json.dumps(data)
-        logger.debug('discovery msg %s: %s', topic, j)
-        mqtt_single_out(client, topic, j)
-        
+    return discovery_msg
+
 
 _switch_callbacks = {}
 _message_queue = queue.Queue()